@@ -0,0 +1,63 @@
+import timeit
+
+import dpath
+
+from pymetweather.forecasts import (
+    DailyForecast, RegionalForecast, ThreeHourForecast)
+
+CAPABILITIES = {'Resource': {'dataDate': '2026-10-17T12:00:00Z', 'res': []}}
+REGIONAL_CAPABILITIES = {'RegionalFcst': {'issuedAt': '2026-10-17T16:00:00'}}
+
+
+def site_doc(site_id):
+    return {'SiteRep': {
+        'Wx': {'Param': []},
+        'DV': {
+            'dataDate': '2026-10-17T12:00:00Z', 'type': 'Forecast',
+            'Location': {'i': str(site_id), 'Period': []}}}}
+
+
+def regional_doc(region):
+    return {'RegionalFcst': {
+        'issuedAt': '2026-10-17T16:00:00', 'regionId': region,
+        'FcstPeriods': {'Period': []}}}
+
+
+def refresh_loop(docs, lookup):
+    for cls, data, capabilities in docs:
+        lookup(data, cls.time_path)
+        lookup(capabilities, cls.update_time_path)
+        lookup(data, cls.time_path)
+        lookup(data, cls.forecast_path)
+
+
+def with_dpath(data, path):
+    return dpath.get(data, path.path)
+
+
+def with_accessor(data, path):
+    return path(data)
+
+
+def main():
+    for sites in [100, 1000]:
+        docs = []
+        for i in range(sites):
+            docs.append((DailyForecast, site_doc(i), CAPABILITIES))
+            docs.append((ThreeHourForecast, site_doc(i), CAPABILITIES))
+            docs.append(
+                (RegionalForecast, regional_doc('se'), REGIONAL_CAPABILITIES))
+
+        times = {}
+        for name, lookup in [
+                ('dpath', with_dpath), ('accessors', with_accessor)]:
+            times[name] = min(timeit.repeat(
+                lambda: refresh_loop(docs, lookup), number=5, repeat=3)) / 5
+        print('{:>5} sites: dpath {:8.2f} ms   accessors {:6.2f} ms'
+              '   x{:.0f}'.format(
+                  sites, times['dpath'] * 1000, times['accessors'] * 1000,
+                  times['dpath'] / times['accessors']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import time
+
+from datapoint_stub import DataPoint
+from pymetweather.alerts import Rule, SiteTable
+from pymetweather.forecasts import ThreeHourForecast
+from pymetweather.table import ForecastTable
+from pymetweather.timeparse import now, parse_date
+
+
+class Site(object):
+    def __init__(self, name, region, table):
+        self.site_name = name
+        self.region_name = region
+        self.forecasts = {'hourly': self}
+        self.table = table
+
+
+def make_sites(count):
+    datapoint = DataPoint(sites=count)
+    sites = []
+    for site in datapoint.sites:
+        doc = datapoint.site(site['id'], '3hourly')
+        table = ForecastTable.from_periods(
+            doc['SiteRep']['DV']['Location']['Period'],
+            ThreeHourForecast.fields)
+        sites.append(Site(site['name'], site['region'], table))
+    return sites
+
+
+def row_by_row(sites, when):
+    start = when.timestamp()
+    alerts = []
+    for site in sites:
+        table = site.table
+        for i, value in enumerate(table.periods):
+            day = parse_date(value).timestamp()
+            for row in table.rows(i):
+                time = day + row['$'] * 60
+                if (start <= time < start + 24 * 3600 and
+                        (row['Pp'] > 70 or row['G'] > 40)):
+                    alerts.append((site.site_name, time))
+    return alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(
+        'Time a threshold and window alert rule over many sites, '
+        'row by row and with the columnar site table'))
+    parser.add_argument('-n', '--sites', type=int, default=500)
+    args = parser.parse_args()
+
+    sites = make_sites(args.sites)
+    rule = Rule('wet-or-windy', when='Pp > 70 or G > 40', window='0 24')
+    when = now()
+
+    start = time.perf_counter()
+    expected = row_by_row(sites, when)
+    rows = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = SiteTable.from_weathers(sites, 'hourly')
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    alerts = rule.evaluate(table, when)
+    evaluated = time.perf_counter() - start
+
+    print('{} sites, {} rows, {} alerts'.format(
+        args.sites, len(table), len(alerts)))
+    print('row by row {:8.2f} ms'.format(rows * 1000))
+    print('site table {:8.2f} ms build, {:.2f} ms evaluate'.format(
+        built * 1000, evaluated * 1000))
+    if len(alerts) != len(expected):
+        raise SystemExit('Alert counts differ: {} != {}'.format(
+            len(alerts), len(expected)))
+
+
+if __name__ == '__main__':
+    main()
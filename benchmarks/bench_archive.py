@@ -0,0 +1,69 @@
+import argparse
+import copy
+import json
+import os
+import random
+import tempfile
+import time
+
+from datapoint_stub import DataPoint
+from pymetweather.archive import ForecastArchive
+
+START = 1767225600
+HOUR = 3600
+
+
+def issues(site, count, seed=1):
+    rnd = random.Random(seed)
+    doc = DataPoint().site(site, '3hourly')
+    for i in range(count):
+        doc = copy.deepcopy(doc)
+        for period in doc['SiteRep']['DV']['Location']['Period']:
+            for rep in period['Rep']:
+                if rnd.random() < 0.2:
+                    rep['T'] = str(rnd.randint(-5, 30))
+        yield START + i * HOUR, doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(
+        'Fill an archive with hourly 3-hourly forecast issues and time '
+        'appends, point lookups and range queries'))
+    parser.add_argument('-n', '--issues', type=int, default=24 * 365)
+    parser.add_argument('-q', '--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = ForecastArchive(directory, '3002-3hourly')
+        raw = 0
+        start = time.perf_counter()
+        for issued, doc in issues('3002', args.issues):
+            raw += len(json.dumps(doc, separators=(',', ':')))
+            archive.append(issued, doc)
+        elapsed = time.perf_counter() - start
+        stored = sum(
+            os.path.getsize(f)
+            for f in [archive.data_file, archive.index_file])
+        print('{} issues: {:.2f} ms per append, {:.1f} MB raw, '
+              '{:.2f} MB stored'.format(
+                  args.issues, elapsed / args.issues * 1000, raw / 1e6,
+                  stored / 1e6))
+
+        rnd = random.Random(2)
+        end = START + args.issues * HOUR
+        start = time.perf_counter()
+        for i in range(args.queries):
+            archive.at(rnd.randrange(START, end))
+        elapsed = time.perf_counter() - start
+        print('point lookup: {:.2f} ms'.format(
+            elapsed / args.queries * 1000))
+
+        start = time.perf_counter()
+        day = rnd.randrange(START, end - 7 * 24 * HOUR)
+        week = list(archive.range(day, day + 7 * 24 * HOUR))
+        print('one week range ({} issues): {:.2f} ms'.format(
+            len(week), (time.perf_counter() - start) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import tempfile
+import time
+
+from datapoint_stub import DataPoint, StubServer
+from pymetweather.batch import BatchForecast
+from pymetweather.forecasts import (
+    DailyForecast, ThreeHourForecast, WeatherClient, parse_table)
+from pymetweather.httpcache import HTTPCache
+
+
+def payloads(datapoint):
+    for site in datapoint.sites:
+        for cls in (ThreeHourForecast, DailyForecast):
+            yield cls, site['id'], json.dumps(
+                datapoint.site(site['id'], cls.res)).encode('utf-8')
+
+
+def parse_all(recorded, archive_dir, pool=None):
+    if pool is None:
+        return [parse_table(cls, content, archive_dir, site_id)
+                for cls, site_id, content in recorded]
+    jobs = [pool.submit(parse_table, cls, content, archive_dir, site_id)
+            for cls, site_id, content in recorded]
+    return [job.result() for job in jobs]
+
+
+def bench_parse(recorded, processes):
+    with tempfile.TemporaryDirectory() as archive_dir:
+        start = time.perf_counter()
+        parse_all(recorded, archive_dir)
+        serial = time.perf_counter() - start
+    print('parse {} payloads: serial {:.2f} s'.format(len(recorded), serial))
+
+    ctx = multiprocessing.get_context('spawn')
+    for workers in processes:
+        with tempfile.TemporaryDirectory() as archive_dir:
+            with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+                # Start the workers before timing
+                list(pool.map(abs, range(workers)))
+                start = time.perf_counter()
+                parse_all(recorded, archive_dir, pool)
+                elapsed = time.perf_counter() - start
+        print('  {:>2} processes {:.2f} s  x{:.1f}'.format(
+            workers, elapsed, serial / elapsed))
+
+
+def bench_batch(datapoint, processes):
+    stub = StubServer(datapoint).start()
+    WeatherClient.base_url = stub.base_url
+    sites = [site['id'] for site in datapoint.sites]
+    for workers in [0] + processes:
+        with tempfile.TemporaryDirectory() as datadir:
+            WeatherClient.cache = HTTPCache(datadir + '/http-cache')
+            batch = BatchForecast('bench', sites, datadir, 20, workers)
+            start = time.perf_counter()
+            failed = batch.refresh()
+            elapsed = time.perf_counter() - start
+        print('batch refresh of {} sites, {:>2} processes: {:.2f} s{}'.format(
+            len(sites), workers, elapsed,
+            ', {} failed'.format(len(failed)) if failed else ''))
+    stub.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(
+        'Time parsing recorded DataPoint payloads, and whole batch '
+        'refreshes against a local stub, with and without worker '
+        'processes'))
+    parser.add_argument('-n', '--sites', type=int, default=500)
+    parser.add_argument(
+        '-p', '--processes', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--parse-only', action='store_true')
+    args = parser.parse_args()
+
+    datapoint = DataPoint(sites=args.sites)
+    bench_parse(list(payloads(datapoint)), args.processes)
+    if not args.parse_only:
+        bench_batch(datapoint, args.processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import random
+import timeit
+
+from pymetweather.formatting import (
+    DAILY_COLUMNS, HOURLY_COLUMNS, daily_rows, hourly_row)
+
+
+def hourly_reps(n):
+    return [{
+        '$': i % 24, 'W': 'Light rain ', 'Pp': random.randint(0, 100),
+        'T': random.randint(-5, 30), 'F': ' (12)', 'S': random.randint(0, 40),
+        'G': ' (20)', 'D': 'ESE', 'H': random.randint(30, 100),
+        'V': '10–20 km', 'U': random.randint(0, 8)} for i in range(n)]
+
+
+def daily_reps(n):
+    return [{
+        '$': 'Day', 'W': 'Cloudy', 'PPd': 10, 'PPn': 20, 'Dm': 19,
+        'FDm': ' (10)', 'Nm': 7, 'FNm': '  (2)', 'S': 7, 'Gn': ' (40)',
+        'Gm': ' (20)', 'D': 'SW', 'Hn': 80, 'Hm': 90,
+        'V': '10–20 km'} for i in range(n)]
+
+
+class Pad(object):
+    def move(self, y, x):
+        pass
+
+    def addstr(self, text, *attrs):
+        pass
+
+
+def per_cell(pad, columns, reps, n=2):
+    for i, rep in enumerate(reps):
+        width_counter = 0
+        for c in columns:
+            cell_text = '{:^{}}'.format(c[n].format(**rep), c[1])
+            pad.move(i, width_counter)
+            pad.addstr(cell_text.encode('utf-8'))
+            width_counter += c[1]
+
+
+def compiled(pad, formatter, reps):
+    for i, rep in enumerate(reps):
+        pad.move(i, 0)
+        pad.addstr(formatter(rep).encode('utf-8'))
+
+
+def bench(name, old, new, rows, number=20):
+    old_time = min(timeit.repeat(old, number=number, repeat=5))
+    new_time = min(timeit.repeat(new, number=number, repeat=5))
+    print('{:<8} per-cell {:7.2f} us/row   compiled {:7.2f} us/row'
+          '   x{:.1f}'.format(
+              name, old_time / number / rows * 1e6,
+              new_time / number / rows * 1e6, old_time / new_time))
+
+
+def main():
+    rows = 1000
+    pad = Pad()
+    hourly = hourly_reps(rows)
+    daily = daily_reps(rows)
+    bench('hourly',
+          lambda: per_cell(pad, HOURLY_COLUMNS, hourly),
+          lambda: compiled(pad, hourly_row, hourly), rows)
+    bench('daily',
+          lambda: per_cell(pad, DAILY_COLUMNS, daily),
+          lambda: compiled(pad, daily_rows[0], daily), rows)
+
+
+if __name__ == '__main__':
+    main()
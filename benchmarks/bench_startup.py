@@ -0,0 +1,75 @@
+import argparse
+import os
+import os.path
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUN = ('import sys; sys.argv = sys.argv[:1] + {!r}; '
+       'from pymetweather.pymetweather import main; main()')
+
+
+def import_times(env):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         'import pymetweather.pymetweather'],
+        env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative))
+    return times
+
+
+def run_time(argv, env):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-c', RUN.format(argv)], env=env, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(
+        'Measure metweather import time and cold/warm start latency of a '
+        'no-update run against an existing forecast directory'))
+    parser.add_argument('-d', '--datadir', default='~/.metweather')
+    parser.add_argument('-l', '--location', required=True)
+    parser.add_argument('-n', '--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        with open(os.path.join(home, '.metweatherrc'), 'w') as f:
+            f.write('[default]\napi_key = benchmark\ndatadir = {}\n'.format(
+                os.path.expanduser(args.datadir)))
+        env = dict(os.environ, HOME=home)
+        argv = ['-d', '-l', args.location, '--format', 'text']
+
+        times = import_times(env)
+        print('import pymetweather.pymetweather: {:.1f} ms'.format(
+            times['pymetweather.pymetweather'][1] / 1000))
+        print('slowest imports (self time):')
+        for name, (self_us, cumulative) in sorted(
+                times.items(), key=lambda t: -t[1][0])[:8]:
+            print('  {:<40} {:7.1f} ms'.format(name, self_us / 1000))
+
+        cold = []
+        for i in range(args.runs):
+            env['PYTHONPYCACHEPREFIX'] = os.path.join(home, 'pyc{}'.format(i))
+            cold.append(run_time(argv, env))
+        del env['PYTHONPYCACHEPREFIX']
+
+        run_time(argv, env)
+        warm = [run_time(argv, env) for i in range(args.runs)]
+
+    for name, samples in [('cold start', cold), ('warm start', warm)]:
+        print('{}: median {:.1f} ms, min {:.1f} ms'.format(
+            name, statistics.median(samples) * 1000, min(samples) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+import sys
+import timeit
+import warnings
+
+import pendulum
+
+from pymetweather.timeparse import local_hours, parse_time
+
+TIMEZONE = 'Europe/London'
+MINUTES = list(range(0, 24 * 60, 30))
+
+
+def days(start, end):
+    day = start
+    while day < end:
+        yield day.strftime('%Y-%m-%dZ')
+        day += timedelta(1)
+
+
+def pendulum_hours(value, minutes):
+    day = pendulum.parse(value.strip('Z'), tz='UTC')
+    return [(day + pendulum.Interval(minutes=m)).in_tz(TIMEZONE).hour
+            for m in minutes]
+
+
+def verify(start, end):
+    failures = 0
+    checked = 0
+    for value in days(start, end):
+        if local_hours(value, MINUTES, TIMEZONE) != pendulum_hours(
+                value, MINUTES):
+            print('hour mismatch on {}'.format(value))
+            failures += 1
+        for m in MINUTES:
+            stamp = '{}T{:02}:{:02}:00'.format(value[:10], m // 60, m % 60)
+            for text in [stamp, stamp + 'Z']:
+                expected = pendulum.parse(text, tz=TIMEZONE)
+                result = parse_time(text, TIMEZONE)
+                checked += 1
+                if (result.timestamp() != expected.timestamp() or
+                        result.utcoffset() != expected.utcoffset() or
+                        result.hour != expected.hour):
+                    print('parse mismatch on {}: {} != {}'.format(
+                        text, result.isoformat(), expected.isoformat()))
+                    failures += 1
+    print('checked {} timestamps and {} days, {} mismatches'.format(
+        checked, (end - start).days, failures))
+    return failures
+
+
+def bench(number=20):
+    periods = list(days(date(2026, 3, 25), date(2026, 3, 30))) * 100
+    minutes = list(range(0, 24 * 60, 180))
+    stamps = ['2026-03-29T{:02}:00:00Z'.format(h) for h in range(24)] * 20
+
+    results = [
+        ('hours, pendulum', lambda: [
+            pendulum_hours(p, minutes) for p in periods]),
+        ('hours, timeparse', lambda: [
+            local_hours(p, minutes, TIMEZONE) for p in periods]),
+        ('parse, pendulum', lambda: [
+            pendulum.parse(s, tz=TIMEZONE) for s in stamps]),
+        ('parse, timeparse', lambda: [
+            parse_time.__wrapped__(s, TIMEZONE) for s in stamps]),
+        ('parse, memoized', lambda: [
+            parse_time(s, TIMEZONE) for s in stamps]),
+    ]
+    for name, func in results:
+        elapsed = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print('{:<20} {:8.2f} ms'.format(name, elapsed * 1000))
+
+
+def main():
+    warnings.simplefilter('ignore')
+    failures = verify(date(2025, 1, 1), date(2028, 1, 1))
+    bench()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+from datetime import date, datetime, timedelta, timezone
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import os.path
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+SITE_PATH = '/public/data/val/wxfcs/all/json/'
+REGION_PATH = '/public/data/txt/wxfcs/regionalforecast/json/'
+REGIONS = ['os', 'he', 'se', 'sw', 'ee', 'wm']
+NAMES = ['London', 'Northolt', 'Exeter', 'Bristol', 'Bath', 'Oxford',
+         'Cambridge', 'York', 'Leeds', 'Londonderry']
+
+
+def issue_time():
+    now = datetime.now(timezone.utc).replace(
+        minute=0, second=0, microsecond=0)
+    return now - timedelta(hours=now.hour % 3)
+
+
+class DataPoint(object):
+    def __init__(self, sites=200, seed=1):
+        rnd = random.Random(seed)
+        self.sites = []
+        for i in range(sites):
+            self.sites.append({
+                'elevation': '10.0', 'id': str(3000 + i),
+                'latitude': '{:.4f}'.format(rnd.uniform(50, 58)),
+                'longitude': '{:.4f}'.format(rnd.uniform(-6, 1.5)),
+                'name': NAMES[i] if i < len(NAMES) else 'Site {}'.format(i),
+                'region': REGIONS[i % len(REGIONS)],
+                'unitaryAuthArea': 'Area {}'.format(i)})
+        self.names = {site['id']: site['name'] for site in self.sites}
+        self.issued = issue_time()
+        self.today = date.today()
+
+    def sitelist(self):
+        return {'Locations': {'Location': self.sites}}
+
+    def region_sitelist(self):
+        return {'Locations': {'Location': [
+            {'@id': str(500 + i), '@name': r}
+            for i, r in enumerate(REGIONS)]}}
+
+    def capabilities(self, res):
+        return {'Resource': {
+            'dataDate': self.issued.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'res': res}}
+
+    def regional_capabilities(self):
+        return {'RegionalFcst': {
+            'issuedAt': self.issued.strftime('%Y-%m-%dT%H:%M:%S')}}
+
+    def site(self, site_id, res):
+        rnd = random.Random(site_id)
+        periods = []
+        for d in range(5):
+            day = self.today + timedelta(d)
+            if res == '3hourly':
+                reps = [{
+                    'D': rnd.choice(['N', 'SW', 'ESE']),
+                    'F': str(rnd.randint(-2, 20)),
+                    'G': str(rnd.randint(5, 50)),
+                    'H': str(rnd.randint(40, 99)),
+                    'Pp': str(rnd.randint(0, 99)),
+                    'S': str(rnd.randint(0, 30)),
+                    'T': str(rnd.randint(-2, 25)),
+                    'V': rnd.choice(['GO', 'VG', 'MO']),
+                    'W': str(rnd.choice([1, 3, 7, 12, 15])),
+                    'U': str(rnd.randint(0, 6)),
+                    '$': str(minutes)} for minutes in range(0, 1440, 180)]
+            else:
+                reps = [{
+                    'D': 'SW', 'Gn': str(rnd.randint(5, 50)), 'Hn': '80',
+                    'V': 'GO', 'W': '7', 'U': '1',
+                    'Dm': str(rnd.randint(5, 25)), 'FDm': '10',
+                    'PPd': '10', 'S': '7', '$': 'Day'
+                }, {
+                    'D': 'NW', 'Gm': str(rnd.randint(5, 50)), 'Hm': '90',
+                    'V': 'MO', 'W': '2', 'Nm': str(rnd.randint(-3, 10)),
+                    'FNm': '2', 'PPn': '20', 'S': '5', '$': 'Night'}]
+            periods.append({
+                'type': 'Day', 'value': day.strftime('%Y-%m-%dZ'),
+                'Rep': reps})
+        return {'SiteRep': {
+            'Wx': {'Param': []},
+            'DV': {
+                'dataDate': self.issued.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'type': 'Forecast',
+                'Location': {
+                    'i': site_id, 'lat': '51.5', 'lon': '-0.1',
+                    'name': self.names.get(site_id, 'X').upper(),
+                    'country': 'ENGLAND', 'continent': 'EUROPE',
+                    'elevation': '10.0', 'Period': periods}}}}
+
+    def regional(self, region_id):
+        tomorrow = self.today + timedelta(1)
+        return {'RegionalFcst': {
+            'createdOn': self.issued.strftime('%Y-%m-%dT%H:%M:%S'),
+            'issuedAt': self.issued.strftime('%Y-%m-%dT%H:%M:%S'),
+            'regionId': REGIONS[int(region_id) - 500],
+            'FcstPeriods': {'Period': [
+                {'id': 'day1to2', 'Paragraph': [
+                    {'title': 'Headline:', '$': 'Dry and bright. ' * 5},
+                    {'title': 'Today:',
+                     '$': 'Sunny spells and a light breeze. ' * 8},
+                    {'title': 'Tonight:',
+                     '$': 'Clear with a touch of frost. ' * 6},
+                    {'title': tomorrow.strftime('%A') + ':',
+                     '$': 'Cloudier with rain later. ' * 6}]},
+                {'id': 'day3to5', 'Paragraph': {
+                    'title': 'Outlook for the weekend:',
+                    '$': 'Unsettled. ' * 20}},
+                {'id': 'day6to15', 'Paragraph': {
+                    'title': 'UK Outlook for next week:',
+                    '$': 'Changeable. ' * 40}},
+                {'id': 'day16to30', 'Paragraph': {
+                    'title': 'UK Outlook for later:',
+                    '$': 'Near normal. ' * 40}}]}}}
+
+    def document(self, path, params):
+        res = params.get('res', [''])[0]
+        resource = path.rstrip('/').rsplit('/', 1)[-1]
+        if '/val/wxfcs/all/json/' in path:
+            if resource == 'sitelist':
+                return self.sitelist()
+            if resource == 'capabilities':
+                return self.capabilities(res)
+            return self.site(resource, res)
+        if '/regionalforecast/json/' in path:
+            if resource == 'sitelist':
+                return self.region_sitelist()
+            if resource == 'capabilities':
+                return self.regional_capabilities()
+            return self.regional(resource)
+        return None
+
+
+def fixture_name(path, params):
+    name = path.split('/public/data/', 1)[-1].strip('/').replace('/', '-')
+    res = params.get('res', [''])[0]
+    return '{}{}.json'.format(name, '-' + res if res else '')
+
+
+def endpoints(site_ids, region_ids):
+    yield SITE_PATH + 'sitelist', {}
+    yield REGION_PATH + 'sitelist', {}
+    yield REGION_PATH + 'capabilities', {}
+    for res in ['daily', '3hourly']:
+        yield SITE_PATH + 'capabilities', {'res': [res]}
+        for site_id in site_ids:
+            yield SITE_PATH + site_id, {'res': [res]}
+    for region_id in region_ids:
+        yield REGION_PATH + region_id, {}
+
+
+def record(source, directory, sites):
+    os.makedirs(directory, exist_ok=True)
+    sitelist = source.document(SITE_PATH + 'sitelist', {})
+    locations = sitelist['Locations']['Location'][:sites]
+    regions = source.document(REGION_PATH + 'sitelist', {})
+    region_ids = [r['@id'] for r in regions['Locations']['Location']]
+
+    for path, params in endpoints(
+            [site['id'] for site in locations], region_ids):
+        if path == SITE_PATH + 'sitelist':
+            document = {'Locations': {'Location': locations}}
+        else:
+            document = source.document(path, params)
+        with open(os.path.join(
+                directory, fixture_name(path, params)), 'w') as f:
+            json.dump(document, f, ensure_ascii=False)
+    return locations
+
+
+class RecordedDataPoint(object):
+    def __init__(self, directory):
+        self.directory = directory
+
+    @property
+    def sites(self):
+        return self.document(SITE_PATH + 'sitelist', {})[
+            'Locations']['Location']
+
+    def document(self, path, params):
+        try:
+            with open(os.path.join(
+                    self.directory, fixture_name(path, params))) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.replace('//', '/')
+        self.server.count(path, self.path, self.headers)
+        time.sleep(self.server.delay)
+        if self.server.status is not None:
+            self.send_error(self.server.status)
+            return
+        body = self.server.datapoint.document(path, parse_qs(url.query))
+        if body is None:
+            self.send_error(404)
+            return
+
+        data = json.dumps(body).encode('utf-8')
+        etag = '"{}"'.format(sha1(data).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_headers(etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_headers(etag)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_headers(self, etag):
+        self.send_header('ETag', etag)
+        for name, value in self.server.response_headers.items():
+            self.send_header(name, value)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, datapoint=None):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.datapoint = datapoint or DataPoint()
+        self.requests = {}
+        self.received = []
+        # Extra headers for every response, a status to fail with and a
+        # delay before responding
+        self.response_headers = {}
+        self.status = None
+        self.delay = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return 'http://127.0.0.1:{}/public/data/'.format(
+            self.server_address[1])
+
+    def count(self, path, target=None, headers=None):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.received.append((target or path, dict(headers or {})))
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
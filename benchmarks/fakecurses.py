@@ -0,0 +1,68 @@
+import curses
+
+
+class FakePad(object):
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.erase()
+
+    def erase(self):
+        self.lines = {}
+        self.y = self.x = 0
+
+    clear = erase
+
+    def move(self, y, x):
+        self.y, self.x = y, x
+
+    def getyx(self):
+        return self.y, self.x
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, *args):
+        if isinstance(args[0], int):
+            self.y, self.x = args[0], args[1]
+            args = args[2:]
+        text = args[0]
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        for ch in text:
+            if ch == '\n':
+                self.y += 1
+                self.x = 0
+                continue
+            if self.y >= self.height or self.x >= self.width:
+                raise curses.error('addstr() returned ERR')
+            self.lines.setdefault(self.y, {})[self.x] = ch
+            self.x += 1
+
+    def noutrefresh(self, *args):
+        pass
+
+    def overwrite(self, dest, sminrow, smincol, dminrow, dmincol, dmaxrow,
+                  dmaxcol):
+        if dmaxrow >= dest.height or dmaxcol >= dest.width:
+            raise curses.error('overwrite() returned ERR')
+        for y in range(sminrow, sminrow + dmaxrow - dminrow + 1):
+            for x, ch in self.lines.get(y, {}).items():
+                if smincol <= x <= smincol + dmaxcol - dmincol:
+                    dest.lines.setdefault(
+                        y - sminrow + dminrow, {})[x - smincol + dmincol] = ch
+
+    def text(self):
+        rows = []
+        for y in range(max(self.lines) + 1 if self.lines else 0):
+            line = self.lines.get(y, {})
+            rows.append(''.join(
+                line.get(x, ' ')
+                for x in range(max(line) + 1 if line else 0)).rstrip())
+        return '\n'.join(rows)
+
+
+def install():
+    curses.newpad = FakePad
+    curses.A_BOLD = 1
+    curses.A_REVERSE = 2
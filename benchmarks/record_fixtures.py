@@ -0,0 +1,42 @@
+import argparse
+
+import requests
+
+from datapoint_stub import DataPoint, record
+
+LIVE_URL = 'http://datapoint.metoffice.gov.uk'
+
+
+class LiveDataPoint(object):
+    def __init__(self, api_key):
+        self.session = requests.Session()
+        self.session.params = {'key': api_key}
+
+    def document(self, path, params):
+        response = self.session.get(
+            LIVE_URL + path, params={k: v[0] for k, v in params.items()},
+            timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(
+        'Record sitelist, capabilities, daily, 3-hourly and regional '
+        'payloads for the benchmark stub server, from DataPoint if an API '
+        'key is given or from the synthetic stub otherwise'))
+    parser.add_argument('directory')
+    parser.add_argument('-n', '--sites', type=int, default=1000)
+    parser.add_argument('-k', '--api-key')
+    args = parser.parse_args()
+
+    if args.api_key:
+        source = LiveDataPoint(args.api_key)
+    else:
+        source = DataPoint(sites=args.sites)
+    sites = record(source, args.directory, args.sites)
+    print('Recorded {} sites to {}'.format(len(sites), args.directory))
+
+
+if __name__ == '__main__':
+    main()
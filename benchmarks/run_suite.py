@@ -0,0 +1,200 @@
+import argparse
+import json
+import os.path
+import platform
+import sys
+import tempfile
+import time
+
+import fakecurses
+from datapoint_stub import (
+    SITE_PATH, DataPoint, RecordedDataPoint, StubServer, fixture_name,
+    record)
+from pymetweather.forecasts import (
+    DailyForecast, ThreeHourForecast, WeatherClient, WeatherForecast)
+from pymetweather.timeparse import parse_date
+
+SCREENS = [0, 1, 2, 3, 4, 7, 8]
+# Differences smaller than this are noise, whatever the ratio
+MIN_SLOWDOWN = 0.001
+
+
+def make_weathers(sites, root, index_file):
+    weathers = []
+    for i, site in enumerate(sites):
+        datadir = os.path.join(root, str(i))
+        os.makedirs(datadir)
+        weather = WeatherForecast('bench', site['name'], datadir)
+        weather.index_file = index_file
+        weathers.append(weather)
+    return weathers
+
+
+def bench_load(sites, root, index_file):
+    WeatherClient.cache = None
+    weathers = make_weathers(sites, root, index_file)
+    start = time.perf_counter()
+    for weather in weathers:
+        weather.load()
+        weather.hourly_fcs, weather.daily_fcs, weather.reg_fcs
+    return time.perf_counter() - start, weathers
+
+
+def bench_matching(sites, weather):
+    index = weather.get_site_index()
+    start = time.perf_counter()
+    for site in sites:
+        weather.get_matching_sites(site['name'], index)
+    return time.perf_counter() - start
+
+
+def bench_process(payloads):
+    start = time.perf_counter()
+    for cls, content in payloads:
+        fc = cls('', None)
+        fc.data = json.loads(content)
+        fc.set_forecast()
+        fc.process_forecast()
+    return time.perf_counter() - start
+
+
+def bench_render(weathers):
+    from pymetweather.pymetweather import WeatherPrinter
+    start = time.perf_counter()
+    for weather in weathers:
+        # Recorded forecasts may be from an earlier day
+        weather.start_date = parse_date(
+            weather.hourly_fcs.periods[0]).date()
+        printer = WeatherPrinter(weather, 100)
+        for screen in SCREENS:
+            printer.render(screen, 100)
+    return time.perf_counter() - start
+
+
+def read_payloads(fixtures, sites):
+    payloads = []
+    for site in sites:
+        for cls in (ThreeHourForecast, DailyForecast):
+            path = os.path.join(fixtures, fixture_name(
+                SITE_PATH + site['id'], {'res': [cls.res]}))
+            with open(path, 'rb') as f:
+                payloads.append((cls, f.read()))
+    return payloads
+
+
+def run(fixtures, sizes, repeat):
+    stub = StubServer(RecordedDataPoint(fixtures)).start()
+    WeatherClient.base_url = stub.base_url
+    all_sites = stub.datapoint.sites
+    results = []
+
+    def report(name, count, times):
+        seconds = min(times)
+        results.append({
+            'benchmark': name, 'sites': count, 'seconds': seconds,
+            'per_site_ms': seconds / count * 1000})
+        print('{:<20} {:>5} sites {:9.3f} s {:8.3f} ms/site'.format(
+            name, count, seconds, seconds / count * 1000), file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as root:
+        index_file = os.path.join(root, 'met-site-index.json')
+        weather = WeatherForecast('bench', None, root)
+        weather.index_file = index_file
+        weather.get_site_index()
+        for count in sizes:
+            if count > len(all_sites):
+                raise SystemExit('Only {} sites recorded in {}'.format(
+                    len(all_sites), fixtures))
+            sites = all_sites[:count]
+
+            times = []
+            for i in range(repeat):
+                elapsed, weathers = bench_load(
+                    sites, os.path.join(root, '{}-{}'.format(count, i)),
+                    index_file)
+                times.append(elapsed)
+            report('load', count, times)
+
+            report('get_matching_sites', count, [
+                bench_matching(sites, weathers[0]) for i in range(repeat)])
+
+            payloads = read_payloads(fixtures, sites)
+            report('process_forecast', count, [
+                bench_process(payloads) for i in range(repeat)])
+
+            report('render', count, [
+                bench_render(weathers) for i in range(repeat)])
+
+    stub.shutdown()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    expected = {
+        (r['benchmark'], r['sites']): r['seconds']
+        for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = expected.get((result['benchmark'], result['sites']))
+        if before is None:
+            continue
+        ratio = result['seconds'] / before
+        print('{:<20} {:>5} sites x{:.2f}'.format(
+            result['benchmark'], result['sites'], ratio), file=sys.stderr)
+        if (ratio > 1 + tolerance and
+                result['seconds'] - before > MIN_SLOWDOWN):
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(
+        'Run the offline benchmark suite against recorded DataPoint '
+        'payloads served by a local stub, and write the results as JSON'))
+    parser.add_argument(
+        '-f', '--fixtures',
+        help='directory of payloads from record_fixtures.py (default: '
+        'record synthetic payloads to a temporary directory)')
+    parser.add_argument(
+        '-s', '--sizes', type=int, nargs='+', default=[1, 100, 1000])
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', help='write the results here')
+    parser.add_argument(
+        '-c', '--compare',
+        help='results file to compare against; exits with status 1 if any '
+        'benchmark is slower by more than the tolerance')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    fakecurses.install()
+    with tempfile.TemporaryDirectory() as recorded:
+        fixtures = args.fixtures
+        if fixtures is None:
+            fixtures = recorded
+            record(DataPoint(sites=max(args.sizes)), fixtures,
+                   max(args.sizes))
+        results = run(fixtures, args.sizes, args.repeat)
+
+    output = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=1)
+    else:
+        json.dump(output, sys.stdout, indent=1)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            raise SystemExit('{} benchmarks slower than {}'.format(
+                len(regressions), args.compare))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+from datapoint_stub import StubServer
+from pymetweather.forecasts import WeatherClient, WeatherForecast
+
+
+def make_weather(base_url, datadir, location):
+    WeatherClient.base_url = base_url
+    return WeatherForecast('stress', location, datadir)
+
+
+def refresh(base_url, datadir, location, barrier):
+    weather = make_weather(base_url, datadir, location)
+    barrier.wait()
+    weather.get_data()
+
+
+def read_forecasts(base_url, datadir, location, seconds, failures):
+    weather = make_weather(base_url, datadir, location)
+    weather.load_site_id_and_region()
+    weather.create_forecasts()
+    end = time.time() + seconds
+    while time.time() < end:
+        for kind, fc in weather.forecasts.items():
+            fc.reload(weather.locations[kind])
+            if fc.needs_update:
+                with failures.get_lock():
+                    failures.value += 1
+
+
+def write_forecasts(base_url, datadir, location, seconds):
+    weather = make_weather(base_url, datadir, location)
+    weather.load_site_id_and_region()
+    weather.make_forecasts()
+    end = time.time() + seconds
+    while time.time() < end:
+        for fc in weather.forecasts.values():
+            fc.write()
+
+
+def run(processes):
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            raise Exception('Stress process failed')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(
+        'Run many processes against one data directory and check that '
+        'they fetch each forecast once and never read a partial file'))
+    parser.add_argument('-p', '--processes', type=int, default=8)
+    parser.add_argument('-t', '--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    stub = StubServer().start()
+    with tempfile.TemporaryDirectory() as datadir:
+        location = 'Exeter'
+        make_weather(
+            stub.base_url, datadir, location).load_site_id_and_region()
+        stub.requests.clear()
+
+        barrier = ctx.Barrier(args.processes)
+        run([ctx.Process(
+            target=refresh,
+            args=(stub.base_url, datadir, location, barrier))
+            for i in range(args.processes)])
+        fetches = sum(
+            count for path, count in stub.requests.items()
+            if not path.endswith(('capabilities', 'sitelist')))
+        checks = sum(
+            count for path, count in stub.requests.items()
+            if path.endswith('capabilities'))
+        print('{} concurrent refreshes: {} forecast fetches (expected 3), '
+              '{} update checks'.format(args.processes, fetches, checks))
+
+        failures = ctx.Value('i', 0)
+        readers = [ctx.Process(
+            target=read_forecasts,
+            args=(stub.base_url, datadir, location, args.seconds, failures))
+            for i in range(args.processes // 2)]
+        writers = [ctx.Process(
+            target=write_forecasts,
+            args=(stub.base_url, datadir, location, args.seconds))
+            for i in range(args.processes - len(readers))]
+        run(readers + writers)
+        print('{} readers and {} writers for {}s: {} failed reads'.format(
+            len(readers), len(writers), args.seconds, failures.value))
+
+    stub.shutdown()
+    if fetches != 3 or failures.value:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import asyncio
+
+import aiohttp
+
+from pymetweather.forecasts import (
+    RetreivalError, SchemaError, WeatherClient, WeatherForecast,
+    describe_error, logger)
+from pymetweather.metrics import metrics
+from pymetweather.transport import RetryPolicy, get_bucket
+
+
+class AsyncWeatherClient(object):
+    def __init__(self, api_key=None, limit_per_host=10, timeout=30,
+                 retries=3, rate_limit=None):
+        self.api_key = api_key
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retry = RetryPolicy(retries)
+        self.bucket = get_bucket(
+            api_key or WeatherClient.api_key, rate_limit)
+        self._session = None
+        self._shared = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=0, limit_per_host=self.limit_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get(self, url, params=None, shared=False):
+        if not shared:
+            return await self.fetch(url, params)
+
+        key = (url, tuple(sorted((params or {}).items())))
+        if key not in self._shared:
+            future = asyncio.ensure_future(self.fetch(url, params))
+            future.add_done_callback(lambda f: self._shared.pop(key, None))
+            self._shared[key] = future
+        return await asyncio.shield(self._shared[key])
+
+    async def fetch(self, url, params=None):
+        params = dict(params or {})
+        params['key'] = self.api_key or WeatherClient.api_key
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                await self.bucket.acquire_async()
+            try:
+                async with self.get_session().get(
+                        url, params=params) as response:
+                    metrics.count('responses', status=response.status)
+                    if not self.retry.retry_status(response.status, attempt):
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+                    reason = 'HTTP {}'.format(response.status)
+                    delay = self.retry.delay(
+                        attempt, response.headers.get('Retry-After'))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.retry.retries:
+                    raise self.error(e)
+                reason = describe_error(e)
+                delay = self.retry.delay(attempt)
+            except (aiohttp.ClientError, ValueError) as e:
+                raise self.error(e)
+            self.retry.log_retry(url, reason, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def error(e):
+        metrics.count('retrieval_errors')
+        return RetreivalError(
+            'Error retreiving forecast: {}'.format(describe_error(e)))
+
+
+class AsyncForecast(object):
+    def __init__(self, forecast, client):
+        self.forecast = forecast
+        self.client = client
+
+    @property
+    def name(self):
+        return type(self.forecast).__name__
+
+    async def load(self, location):
+        await asyncio.to_thread(self.forecast.reload, location)
+
+    async def check(self):
+        fc = self.forecast
+        if not fc.check_required():
+            return
+
+        logger.info('check for updates required {}'.format(self.name))
+        try:
+            with metrics.span('check', forecast=self.name):
+                result = await self.client.get(
+                    *fc.update_time_request(), shared=True)
+            fc.update_time_path(result)
+            logger.info('Retrived update times {}'.format(self.name))
+        except RetreivalError:
+            logger.error('Could not get update times {}'.format(self.name))
+            fc.status = False
+        except SchemaError as e:
+            logger.error('Could not get update times {}: {}'.format(
+                self.name, e))
+            metrics.count('schema_errors', forecast=self.name)
+            fc.status = False
+        else:
+            fc.check_update_time(result)
+
+    async def update(self):
+        fc = self.forecast
+        if not fc.needs_update:
+            return
+
+        logger.info('getting forecast {}'.format(self.name))
+        try:
+            with metrics.span('download', forecast=self.name):
+                data = await self.client.get(*fc.data_request())
+            fc.check_schema(data)
+            logger.info('Updated forecast {}'.format(self.name))
+        except RetreivalError:
+            logger.error('Could not update {}'.format(self.name))
+            fc.status = False
+        except SchemaError as e:
+            logger.error('Could not update {}: {}'.format(self.name, e))
+            metrics.count('schema_errors', forecast=self.name)
+            fc.status = False
+        else:
+            await asyncio.to_thread(fc.set_data, data)
+
+
+class AsyncWeatherForecast(WeatherForecast):
+    def __init__(self, api_key, site_name, datadir, client):
+        super().__init__(api_key, site_name, datadir)
+        self.client = client
+
+    async def load(self, no_updates=False):
+        await self.get_data(no_updates)
+
+    async def get_data(self, no_updates=False):
+        self.no_updates = no_updates
+        # Site lookup and forecast files are blocking I/O
+        await asyncio.to_thread(self.load_site_id_and_region)
+        self.create_forecasts()
+
+        forecasts = [
+            AsyncForecast(fc, self.client) for fc in self.forecasts.values()]
+        await asyncio.gather(*[
+            fc.load(self.locations[kind])
+            for kind, fc in zip(self.forecasts, forecasts)])
+
+        missing_forecasts = any([
+            fc.needs_update for fc in self.forecasts.values()])
+
+        if not no_updates:
+            await asyncio.gather(*[fc.check() for fc in forecasts])
+        await asyncio.gather(*[fc.update() for fc in forecasts])
+        self.check_status(missing_forecasts)
+        self.ready.update(self.forecasts)
+
+
+async def load_forecasts(weathers, no_updates=False):
+    return await asyncio.gather(
+        *[w.load(no_updates) for w in weathers], return_exceptions=True)
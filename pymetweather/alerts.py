@@ -0,0 +1,307 @@
+from array import array
+from configparser import RawConfigParser
+from datetime import datetime, timezone
+from functools import partial, reduce
+import json
+import operator
+import re
+
+from pymetweather.forecasts import DailyForecast, ThreeHourForecast, logger
+from pymetweather.metrics import metrics
+from pymetweather.table import MISSING
+from pymetweather.timeparse import now, parse_date
+
+OPERATORS = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt,
+    '<=': operator.le, '==': operator.eq, '!=': operator.ne}
+# The same comparisons with the threshold first, for use with partial
+REVERSED = {
+    '>': operator.lt, '>=': operator.le, '<': operator.gt,
+    '<=': operator.ge, '==': operator.eq, '!=': operator.ne}
+AGGREGATES = {'max': max, 'min': min}
+FORECASTS = {'hourly': ThreeHourForecast, 'daily': DailyForecast}
+GROUPS = ('site', 'region', 'date')
+OPTIONS = ('forecast', 'when', 'window', 'aggregate', 'by')
+TERM = re.compile(r'^\s*([\w$]+)\s*(>=|<=|==|!=|>|<)\s*(\S+)\s*$')
+HOUR = 3600
+DAY = 24 * HOUR
+# Daily forecasts are for the day (06:00-18:00) and the night after it
+DAILY_OFFSETS = (6 * HOUR, 18 * HOUR)
+
+
+# Masks hold one byte per row, as big integers so they combine in one step
+def bits(values):
+    return int.from_bytes(bytearray(values), 'little')
+
+
+class SiteTable(object):
+    def __init__(self, kind, fields, sites, regions, columns, site_rows,
+                 times):
+        self.kind = kind
+        self.fields = fields
+        self.vocabs = dict(fields)
+        self.sites = sites
+        self.regions = regions
+        self.columns = columns
+        self.site_rows = site_rows
+        self.times = times
+
+    @classmethod
+    def from_weathers(cls, weathers, kind):
+        fields = None
+        sites = []
+        regions = []
+        columns = {}
+        site_rows = array('l')
+        times = array('q')
+
+        for weather in weathers:
+            table = weather.forecasts[kind].table
+            if table is None:
+                continue
+            if fields is None:
+                fields = table.fields
+                columns = {
+                    name: array('b' if vocab else 'h')
+                    for name, vocab in fields}
+            for name, vocab in fields:
+                columns[name].frombytes(
+                    memoryview(table.columns[name]).cast('B'))
+
+            site_rows.extend([len(sites)] * len(table))
+            sites.append(weather.site_name)
+            regions.append(weather.region_name)
+            for i, value in enumerate(table.periods):
+                start = int(parse_date(value).timestamp())
+                column = table.column('$', i)
+                if kind == 'daily':
+                    times.extend(start + DAILY_OFFSETS[n] for n in column)
+                else:
+                    times.extend(start + minutes * 60 for minutes in column)
+
+        return cls(kind, fields or (), sites, regions, columns, site_rows,
+                   times)
+
+    def __len__(self):
+        return len(self.times)
+
+    def compare(self, name, op, value):
+        if name not in self.columns:
+            raise ValueError('Unknown {} forecast column {}'.format(
+                self.kind, name))
+        column = self.columns[name]
+        vocab = self.vocabs[name]
+        if vocab:
+            missing = -1
+            value = vocab.index(value) if value in vocab else -2
+        else:
+            missing = MISSING
+            value = float(value)
+        mask = bits(map(partial(REVERSED[op], value), column))
+        if OPERATORS[op](missing, value):
+            mask &= bits(map(partial(operator.ne, missing), column))
+        return mask
+
+    def window(self, start, end):
+        return (bits(map(partial(operator.le, start), self.times)) &
+                bits(map(partial(operator.gt, end), self.times)))
+
+    def value(self, name, i):
+        value = self.columns[name][i]
+        vocab = self.vocabs[name]
+        if vocab:
+            return vocab[value] if value >= 0 else None
+        return None if value == MISSING else value
+
+    def group_key(self, by, i):
+        site = self.site_rows[i]
+        key = {
+            'site': self.sites[site], 'region': self.regions[site],
+            'date': datetime.fromtimestamp(
+                self.times[i] // DAY * DAY, timezone.utc).strftime(
+                    '%Y-%m-%d')}
+        return tuple(key[name] for name in by)
+
+
+def parse_condition(text):
+    clauses = []
+    for clause in re.split(r'\s+or\s+', text.strip()):
+        terms = []
+        for term in re.split(r'\s+and\s+', clause):
+            match = TERM.match(term)
+            if match is None:
+                raise ValueError('Could not parse condition {}'.format(term))
+            terms.append(match.groups())
+        clauses.append(terms)
+    return clauses
+
+
+def parse_aggregates(text):
+    aggregates = []
+    for item in text.split(','):
+        if len(item.split()) != 2:
+            raise ValueError('Could not parse aggregate {}'.format(item))
+        func, name = item.split()
+        if func not in AGGREGATES:
+            raise ValueError('Unknown aggregate {}'.format(func))
+        aggregates.append((func, name))
+    return aggregates
+
+
+class Rule(object):
+    def __init__(self, name, forecast='hourly', when=None, window=None,
+                 aggregate=None, by='site'):
+        if forecast not in FORECASTS:
+            raise ValueError('Unknown forecast {}, expected {}'.format(
+                forecast, ' or '.join(FORECASTS)))
+        self.name = name
+        self.forecast = forecast
+        self.condition = parse_condition(when) if when else []
+        self.window = [float(h) for h in window.split()] if window else None
+        if self.window is not None and len(self.window) != 2:
+            raise ValueError('Window should be a start and end hour')
+        self.aggregates = parse_aggregates(aggregate) if aggregate else []
+        self.by = [key.strip() for key in by.split(',')]
+        self.validate()
+
+    @classmethod
+    def from_section(cls, name, section):
+        for option in section:
+            if option not in OPTIONS:
+                raise ValueError('Unknown option {}'.format(option))
+        return cls(name, **dict(section))
+
+    def validate(self):
+        vocabs = dict(FORECASTS[self.forecast].fields)
+        names = self.columns + [name for func, name in self.aggregates]
+        for name in names:
+            if name not in vocabs:
+                raise ValueError('Unknown {} forecast column {}'.format(
+                    self.forecast, name))
+
+        for clause in self.condition:
+            for name, op, value in clause:
+                vocab = vocabs[name]
+                if vocab and value not in vocab:
+                    raise ValueError('{} should be one of {}, not {}'.format(
+                        name, ' '.join(vocab), value))
+                if not vocab:
+                    try:
+                        float(value)
+                    except ValueError:
+                        raise ValueError('{} should be compared with a '
+                                         'number, not {}'.format(name, value))
+
+        for key in self.by:
+            if key not in GROUPS:
+                raise ValueError('Unknown group {}, expected {}'.format(
+                    key, ', '.join(GROUPS)))
+
+    @property
+    def columns(self):
+        names = [name for clause in self.condition for name, op, v in clause]
+        return sorted(set(names))
+
+    def mask(self, table, when):
+        size = len(table)
+        result = bits(b'\x01' * size)
+        if self.condition:
+            result &= reduce(operator.or_, [
+                reduce(operator.and_, [
+                    table.compare(name, op, value)
+                    for name, op, value in clause])
+                for clause in self.condition])
+        if self.window is not None:
+            start = when.timestamp()
+            result &= table.window(
+                start + self.window[0] * HOUR, start + self.window[1] * HOUR)
+        return bytearray(result.to_bytes(size, 'little'))
+
+    def rows(self, mask):
+        i = mask.find(1)
+        while i >= 0:
+            yield i
+            i = mask.find(1, i + 1)
+
+    def evaluate(self, table, when):
+        if not len(table):
+            return []
+        mask = self.mask(table, when)
+        if self.aggregates:
+            return self.aggregate(table, mask)
+
+        alerts = []
+        for i in self.rows(mask):
+            alerts.append({
+                'rule': self.name,
+                'site': table.sites[table.site_rows[i]],
+                'forecast': self.forecast,
+                'time': datetime.fromtimestamp(
+                    table.times[i], timezone.utc).strftime(
+                        '%Y-%m-%dT%H:%MZ'),
+                'values': {
+                    name: table.value(name, i) for name in self.columns}})
+        return alerts
+
+    def aggregate(self, table, mask):
+        groups = {}
+        for i in self.rows(mask):
+            group = groups.setdefault(table.group_key(self.by, i), {})
+            for func, name in self.aggregates:
+                value = table.value(name, i)
+                if value is None:
+                    continue
+                key = '{}_{}'.format(func, name)
+                if key in group:
+                    value = AGGREGATES[func](group[key], value)
+                group[key] = value
+
+        results = []
+        for key, values in sorted(groups.items()):
+            result = {'rule': self.name, 'forecast': self.forecast}
+            result.update(zip(self.by, key))
+            result.update(values)
+            results.append(result)
+        return results
+
+
+class Rules(object):
+    def __init__(self, rules):
+        self.rules = rules
+
+    @classmethod
+    def load(cls, path):
+        cp = RawConfigParser()
+        if not cp.read([path]):
+            raise Exception('Could not read alert rules {}'.format(path))
+        rules = []
+        for name in cp.sections():
+            try:
+                rules.append(Rule.from_section(name, cp[name]))
+            except ValueError as e:
+                raise Exception('Alert rule [{}] in {}: {}'.format(
+                    name, path, e))
+        return cls(rules)
+
+    def evaluate(self, weathers, when=None):
+        if when is None:
+            when = now()
+        tables = {}
+        alerts = []
+        for rule in self.rules:
+            if rule.forecast not in tables:
+                tables[rule.forecast] = SiteTable.from_weathers(
+                    weathers, rule.forecast)
+            with metrics.span('alerts', rule=rule.name):
+                results = rule.evaluate(tables[rule.forecast], when)
+            metrics.count('alerts', len(results), rule=rule.name)
+            alerts.extend(results)
+        logger.info('{} alerts from {} rules'.format(
+            len(alerts), len(self.rules)))
+        return alerts
+
+
+def write_alerts(alerts, stream):
+    for alert in alerts:
+        stream.write(json.dumps(alert, ensure_ascii=False) + '\n')
+    stream.flush()
@@ -0,0 +1,177 @@
+from bisect import bisect_left, bisect_right
+import json
+import mmap
+import os
+import os.path
+import struct
+import zlib
+
+from pymetweather.storage import locked
+
+# Index records: issue time, data offset, data length, flags
+RECORD = struct.Struct('<qQII')
+KEYFRAME = 1
+KEYFRAME_INTERVAL = 24
+UNCHANGED = '='
+
+
+def site_periods(document):
+    try:
+        periods = document['SiteRep']['DV']['Location']['Period']
+    except (KeyError, TypeError):
+        return None
+    return periods if isinstance(periods, list) else None
+
+
+def rep_key(period, rep):
+    return period['value'], rep.get('$')
+
+
+def encode(document, previous=None):
+    periods = site_periods(document)
+    if previous is None or periods is None:
+        return document
+
+    known = {
+        rep_key(period, rep): rep
+        for period in site_periods(previous) or [] for rep in period['Rep']}
+    delta = [
+        dict(period, Rep=[
+            {UNCHANGED: rep.get('$')}
+            if known.get(rep_key(period, rep)) == rep else rep
+            for rep in period['Rep']])
+        for period in periods]
+
+    location = dict(document['SiteRep']['DV']['Location'], Period=delta)
+    dv = dict(document['SiteRep']['DV'], Location=location)
+    return dict(document, SiteRep=dict(document['SiteRep'], DV=dv))
+
+
+def decode(document, previous):
+    periods = site_periods(document)
+    if previous is None or periods is None:
+        return document
+
+    known = {
+        rep_key(period, rep): rep
+        for period in site_periods(previous) or [] for rep in period['Rep']}
+    for period in periods:
+        period['Rep'] = [
+            known[period['value'], rep[UNCHANGED]] if UNCHANGED in rep
+            else rep
+            for rep in period['Rep']]
+    return document
+
+
+class IssueTimes(object):
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index) // RECORD.size
+
+    def __getitem__(self, i):
+        return RECORD.unpack_from(self.index, i * RECORD.size)[0]
+
+
+class ForecastArchive(object):
+    def __init__(self, directory, stream):
+        self.directory = directory
+        base = os.path.join(directory, stream)
+        self.data_file = base + '.dat'
+        self.index_file = base + '.idx'
+        self.lock_file = base + '.lock'
+
+    def read_index(self):
+        try:
+            with open(self.index_file, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < RECORD.size:
+                    return b''
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return b''
+        # Ignore a record left half written by an interrupted append
+        return memoryview(index)[:size - size % RECORD.size]
+
+    def records(self, index, start, stop):
+        return [RECORD.unpack_from(index, i * RECORD.size)
+                for i in range(start, stop)]
+
+    def read_documents(self, index, start, stop):
+        while start > 0 and not self.records(
+                index, start, start + 1)[0][3] & KEYFRAME:
+            start -= 1
+
+        document = None
+        with open(self.data_file, 'rb') as f:
+            for i, (issued, offset, length, flags) in enumerate(
+                    self.records(index, start, stop), start):
+                f.seek(offset)
+                record = json.loads(zlib.decompress(f.read(length)))
+                document = decode(
+                    record, None if flags & KEYFRAME else document)
+                yield i, issued, document
+
+    def issues(self, start=None, end=None):
+        index = self.read_index()
+        times = IssueTimes(index)
+        first, last = self.bounds(times, start, end)
+        return [times[i] for i in range(first, last)]
+
+    @staticmethod
+    def bounds(times, start, end):
+        first = 0 if start is None else bisect_left(times, start)
+        last = len(times) if end is None else bisect_right(times, end)
+        return first, last
+
+    def range(self, start=None, end=None):
+        index = self.read_index()
+        first, last = self.bounds(IssueTimes(index), start, end)
+        if first >= last:
+            return
+        for i, issued, document in self.read_documents(index, first, last):
+            if i >= first:
+                yield issued, document
+
+    def at(self, when):
+        index = self.read_index()
+        last = bisect_right(IssueTimes(index), when)
+        if not last:
+            return None
+        return self.read_document(index, last - 1)
+
+    def read_document(self, index, i):
+        for j, issued, document in self.read_documents(index, i, i + 1):
+            pass
+        return issued, document
+
+    def append(self, issued, document):
+        os.makedirs(self.directory, exist_ok=True)
+        with locked(self.lock_file):
+            index = self.read_index()
+            count = len(index) // RECORD.size
+            if count and IssueTimes(index)[count - 1] >= issued:
+                return False
+
+            if count % KEYFRAME_INTERVAL:
+                previous = self.read_document(index, count - 1)[1]
+                flags = 0
+            else:
+                previous = None
+                flags = KEYFRAME
+            data = zlib.compress(json.dumps(
+                encode(document, previous), ensure_ascii=False,
+                separators=(',', ':')).encode('utf-8'))
+
+            with open(self.data_file, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.index_file, 'ab') as f:
+                f.truncate(count * RECORD.size)
+                f.write(RECORD.pack(int(issued), offset, len(data), flags))
+                f.flush()
+                os.fsync(f.fileno())
+        return True
@@ -0,0 +1,202 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import multiprocessing
+import os.path
+import re
+
+from pymetweather.forecasts import (
+    DailyForecast, WeatherClient, WeatherForecast, RetreivalError,
+    SchemaError, logger)
+from pymetweather.httpcache import HTTPCache
+from pymetweather.metrics import metrics
+from pymetweather.storage import locked
+
+
+class BatchForecast(object):
+    kinds = ('hourly', 'daily', 'regional')
+
+    def __init__(self, api_key, sites, datadir, max_workers=10, processes=0):
+        self.api_key = api_key
+        self.datadir = datadir
+        self.processes = processes
+        self.sites = [s.strip() for s in sites if s.strip()]
+
+        WeatherClient.api_key = api_key
+        WeatherClient.max_workers = max_workers
+        WeatherClient.cache = HTTPCache(os.path.join(datadir, 'http-cache'))
+
+        self.index = None
+        self.index_file = os.path.join(datadir, 'met-site-index.json')
+        self.lock_file = os.path.join(datadir, 'met-batch.lock')
+        self.weathers = {}
+
+    @staticmethod
+    def read_sites_file(sites_file):
+        with open(sites_file) as f:
+            return [
+                line.split('#')[0].strip() for line in f
+                if line.split('#')[0].strip()]
+
+    def site_dir(self, site):
+        # The slug is only for reading; the hash keeps the lines apart
+        slug = re.sub(r'[^\w.-]+', '-', site.lower()).strip('-.')
+        digest = hashlib.sha1(site.encode('utf-8')).hexdigest()[:12]
+        site_dir = os.path.join(
+            self.datadir, 'sites', '{}-{}'.format(slug, digest))
+        os.makedirs(site_dir, exist_ok=True)
+        return site_dir
+
+    def get_site_index(self, weather):
+        if self.index is None:
+            self.index = weather.get_site_index()
+        return self.index
+
+    def resolve_site(self, weather, site):
+        try:
+            with open(weather.site_file) as f:
+                data = json.load(f)
+        except IOError:
+            pass
+        else:
+            if weather.coordinates is not None:
+                reuse = data.get('coordinates') == list(weather.coordinates)
+            else:
+                reuse = (
+                    (site in (data['site_id'], data['name'])) or
+                    (weather.process_name(data['name']).startswith(
+                        weather.process_name(site))))
+            if reuse:
+                weather.site_name = data['name']
+                weather.site_id = data['site_id']
+                weather.region_name = data['region_name']
+                weather.region_id = data['region_id']
+                return True
+
+        index = self.get_site_index(weather)
+        if weather.coordinates is not None:
+            matches = weather.get_nearest_sites(
+                *weather.coordinates, index=index)
+        elif site.isdigit():
+            matches = [m for m in [index.get(site)] if m is not None]
+        else:
+            matches = weather.get_matching_sites(site, index)
+        if not matches:
+            logger.error('No site matching {} found'.format(site))
+            return False
+
+        weather.set_site(matches[0])
+        return True
+
+    def load(self):
+        for site in self.sites:
+            try:
+                weather = WeatherForecast(
+                    self.api_key, site, self.site_dir(site))
+            except ValueError as e:
+                logger.error(e)
+                continue
+            weather.index_file = self.index_file
+            weather.archive_dir = os.path.join(self.datadir, 'archive')
+            if self.resolve_site(weather, site):
+                weather.make_forecasts()
+                self.weathers[site] = weather
+
+    def forecasts(self, kind):
+        return [w.forecasts[kind] for w in self.weathers.values()]
+
+    def stale(self, no_updates):
+        return {
+            kind: [
+                fc for fc in self.forecasts(kind)
+                if fc.refresh_required(no_updates)]
+            for kind in self.kinds}
+
+    def check_for_updates(self, stale):
+        for kind in self.kinds:
+            to_check = [fc for fc in stale[kind] if fc.check_required()]
+            if not to_check:
+                continue
+
+            logger.info('check for updates required {} for {} sites'.format(
+                kind, len(to_check)))
+            try:
+                result = WeatherClient.get_result(
+                    to_check[0].get_update_time_data())
+                to_check[0].update_time_path(result)
+            except (RetreivalError, SchemaError) as e:
+                logger.error('Could not get update times {}: {}'.format(
+                    kind, e))
+                for fc in to_check:
+                    fc.status = False
+                continue
+
+            for fc in to_check:
+                fc.check_update_time(result)
+
+    def update(self, stale):
+        to_update = {}
+        shared = {}
+        for kind in self.kinds:
+            for fc in stale[kind]:
+                if not fc.needs_update:
+                    continue
+                if kind == 'regional':
+                    key = (kind, fc.weather.region_id)
+                else:
+                    key = (kind, fc.weather.site_id)
+                if key in to_update:
+                    shared.setdefault(key, []).append(fc)
+                else:
+                    to_update[key] = fc
+
+        logger.info('Updating {} forecasts'.format(len(to_update)))
+        for fc in to_update.values():
+            fc.start_update()
+        if self.processes and to_update:
+            with ProcessPoolExecutor(
+                    self.processes,
+                    mp_context=multiprocessing.get_context('spawn')) as pool:
+                self.complete_in_pool(to_update.values(), pool)
+        else:
+            for fc in to_update.values():
+                fc.complete_update()
+
+        for key, fc in to_update.items():
+            for other in shared.get(key, []):
+                if fc.status:
+                    other.share(fc)
+                else:
+                    other.status = False
+
+    @staticmethod
+    def complete_in_pool(forecasts, pool):
+        jobs = []
+        for fc in forecasts:
+            if (not isinstance(fc, DailyForecast) or
+                    WeatherClient.shared_tables):
+                fc.complete_update()
+                continue
+            content = fc.receive_update()
+            if content is not None:
+                jobs.append((fc, fc.start_parse(pool, content)))
+        for fc, job in jobs:
+            fc.complete_parse(job)
+
+    def refresh(self, no_updates=False):
+        with metrics.span('batch_refresh'):
+            # One lock for every site, taken before any forecast is read
+            with locked(self.lock_file):
+                self.load()
+                stale = self.stale(no_updates)
+                if not no_updates:
+                    self.check_for_updates(stale)
+                self.update(stale)
+
+        failed = [
+            site for site, w in self.weathers.items()
+            if not all(fc.status for fc in w.forecasts.values())]
+        for site in failed:
+            logger.warning('Retreival error for {}'.format(site))
+        metrics.count('failed_sites', len(failed))
+        return failed
@@ -40,3 +40,10 @@ VISIBILITY_TYPES = {
     'VG': '20–40 km',
     'EX': ' > 40 km'
 }
+
+VISIBILITY = ('UN', 'VP', 'PO', 'MO', 'GO', 'VG', 'EX')
+
+# Names without the (day)/(night) qualifier, indexed by weather type code
+WEATHER_NAMES = tuple(
+    WEATHER_TYPES[str(code)].split('(')[0]
+    for code in range(len(WEATHER_TYPES)))
@@ -0,0 +1,138 @@
+import json
+import random
+import sys
+import time
+
+from pymetweather.forecasts import logger
+from pymetweather.metrics import metrics
+from pymetweather.storage import atomic_write
+
+
+class RefreshDaemon(object):
+    poll_interval = 10 * 60
+    max_backoff = 60 * 60
+    jitter = 0.05
+    min_jitter = 30
+    history = 12
+
+    def __init__(self, weather, no_updates=False, metrics_file=None,
+                 rules=None):
+        self.weather = weather
+        self.no_updates = no_updates
+        self.metrics_file = metrics_file
+        self.rules = rules
+        self.alerted = None
+        self.state_file = '{}/met-daemon.json'.format(weather.datadir)
+        self.state = {}
+
+    def load_state(self):
+        try:
+            with open(self.state_file) as f:
+                self.state = json.load(f)
+        except (IOError, ValueError):
+            self.state = {}
+        for kind in self.weather.forecasts:
+            self.state.setdefault(
+                kind, {'issues': [], 'failures': 0, 'next': 0})
+
+    def save_state(self):
+        with atomic_write(self.state_file) as f:
+            json.dump(self.state, f)
+
+    def cadence(self, kind):
+        issues = self.state[kind]['issues']
+        gaps = sorted(b - a for a, b in zip(issues, issues[1:]) if b > a)
+        if gaps:
+            return gaps[len(gaps) // 2]
+        return self.weather.forecasts[kind].updatedelta.total_seconds()
+
+    def add_jitter(self, delay):
+        return delay + random.uniform(
+            0, max(self.min_jitter, delay * self.jitter))
+
+    def backoff(self, failures):
+        delay = min(
+            self.max_backoff, self.poll_interval * 2 ** (failures - 1))
+        return random.uniform(delay / 2, delay)
+
+    def schedule(self, kind, now):
+        state = self.state[kind]
+        if state['failures']:
+            return now + self.backoff(state['failures'])
+
+        cadence = self.cadence(kind)
+        if state['issues']:
+            due = state['issues'][-1] + cadence
+            if due > now:
+                return due + self.add_jitter(0)
+        return now + self.add_jitter(min(self.poll_interval, cadence))
+
+    def record_issue(self, kind, issued):
+        issues = self.state[kind]['issues']
+        if not issues or issued > issues[-1]:
+            issues.append(issued)
+            del issues[:-self.history]
+            return True
+        return False
+
+    def refresh(self, kind, now):
+        fc = self.weather.forecasts[kind]
+        fc.status = True
+        fc.refresh(self.weather.locations[kind], self.no_updates, force=True)
+
+        state = self.state[kind]
+        new_issue = False
+        if fc.status and fc.data is not None:
+            state['failures'] = 0
+            new_issue = self.record_issue(kind, fc.time().timestamp())
+        else:
+            state['failures'] += 1
+            metrics.count('daemon_failures', forecast=kind)
+            logger.warning('Retreival error {} - failure {}'.format(
+                kind, state['failures']))
+        state['next'] = self.schedule(kind, now)
+        logger.info('Next check of {} at {}'.format(
+            kind, time.strftime('%H:%M:%S', time.localtime(state['next']))))
+        return new_issue
+
+    def run_once(self):
+        now = time.time()
+        updated = False
+        for kind in self.weather.forecasts:
+            if self.state[kind]['next'] <= now:
+                updated |= self.refresh(kind, now)
+        self.save_state()
+        if self.rules is not None and (updated or self.alerted is None):
+            self.send_alerts()
+        if self.metrics_file:
+            metrics.write(self.metrics_file)
+        return min(state['next'] for state in self.state.values())
+
+    def send_alerts(self):
+        from pymetweather.alerts import write_alerts
+        for kind, fc in self.weather.forecasts.items():
+            if fc.data is None:
+                fc.reload(self.weather.locations[kind])
+
+        # Only report alerts that were not raised by the previous issue
+        alerted = {
+            json.dumps(alert, sort_keys=True): alert
+            for alert in self.rules.evaluate([self.weather])}
+        write_alerts([
+            alert for key, alert in alerted.items()
+            if key not in (self.alerted or ())], sys.stdout)
+        self.alerted = set(alerted)
+
+    def run(self):
+        self.weather.load_site_id_and_region()
+        self.weather.create_forecasts()
+        self.load_state()
+
+        logger.info('Starting refresh daemon for {}'.format(
+            self.weather.site_name))
+        try:
+            while True:
+                next_time = self.run_once()
+                time.sleep(max(1, next_time - time.time()))
+        except KeyboardInterrupt:
+            logger.info('Stopping refresh daemon')
@@ -1,55 +1,190 @@
 from abc import ABC, abstractmethod, abstractproperty
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
 import json
 import logging
-import re
+import os.path
 import sys
-
-import dpath
-from requests_futures.sessions import FuturesSession
-import pendulum
-
-from pymetweather.codes import WEATHER_TYPES, VISIBILITY_TYPES
+import threading
+import time
+from types import SimpleNamespace
+
+from pymetweather.archive import ForecastArchive
+from pymetweather.codes import VISIBILITY
+from pymetweather.httpcache import HTTPCache
+from pymetweather.metrics import metrics
+from pymetweather.sites import (
+    SiteIndex, get_site_info, parse_coordinates, process_name)
+from pymetweather.storage import atomic_write, locked
+from pymetweather.table import COMPASS, DAY_NIGHT, ForecastTable
+from pymetweather.tablefile import read_table, table_bytes, write_table
+from pymetweather.timeparse import local_hours, now, parse_date, parse_time
 
 BASE_URL = 'http://datapoint.metoffice.gov.uk/public/data/'
-MAIN_URL = BASE_URL + 'val/wxfcs/all/json/'
-TEXT_URL = BASE_URL + 'txt/wxfcs/regionalforecast/json/'
+MAIN_PATH = 'val/wxfcs/all/json/'
+TEXT_PATH = 'txt/wxfcs/regionalforecast/json/'
+TABLE_PATH = 'tables/'
 TIMEZONE = 'Europe/London'
 
 logger = logging.getLogger('pymetweather')
-logger.setLevel(logging.DEBUG)
-ch = logging.StreamHandler()
-ch.setFormatter(logging.Formatter(
-    '%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
-logger.addHandler(ch)
+
+
+def setup_logging():
+    logger.setLevel(logging.DEBUG)
+    ch = logging.StreamHandler()
+    ch.setFormatter(logging.Formatter(
+        '%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'))
+    logger.addHandler(ch)
+
+
+class HeldRecords(logging.Handler):
+    def __init__(self, level):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@contextmanager
+def hold_logging(level=logging.WARNING):
+    # Nothing may write to the terminal while curses owns it, so records
+    # are kept back and handled once it has been given back
+    handlers = logger.handlers
+    held = HeldRecords(level)
+    logger.handlers = [held]
+    try:
+        yield
+    finally:
+        logger.handlers = handlers
+        for record in held.records:
+            logger.handle(record)
 
 
 class RetreivalError(Exception):
     pass
 
 
+def describe_error(error):
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    status = status or getattr(error, 'status', None)
+    if status:
+        return 'HTTP {}'.format(status)
+    return type(error).__name__
+
+
+class SchemaError(ValueError):
+    pass
+
+
+class KeyPath(object):
+    def __init__(self, path):
+        self.path = path
+        self.keys = tuple(path.split('/'))
+
+    def __call__(self, data):
+        value = data
+        for key in self.keys:
+            try:
+                value = value[key]
+            except (KeyError, TypeError):
+                raise SchemaError(
+                    'Expected {} in forecast data but {} is missing'.format(
+                        self.path, key))
+        return value
+
+
 class WeatherClient(object):
-    _session = None
+    _transport = None
     api_key = None
+    max_workers = 10
+    timeout = 30
+    retries = 3
+    rate_limit = None
+    cache = None
+    base_url = BASE_URL
+    # Set when base_url is a cache server, which sends processed tables
+    shared_tables = False
+
+    @classmethod
+    def get_transport(cls):
+        if cls._transport is None:
+            from pymetweather.transport import Transport
+            cls._transport = Transport(
+                cls.api_key, cls.max_workers, cls.timeout, cls.retries,
+                cls.rate_limit)
+        return cls._transport
 
     @classmethod
-    def get_session(cls):
-        if cls._session is None:
-            cls._session = FuturesSession(max_workers=5)
-            cls._session.params = {'key': cls.api_key}
-        return cls._session
+    def url(cls, *parts):
+        return cls.base_url + ''.join(parts)
 
     @classmethod
     def get(cls, url, params=None):
-        return cls.get_session().get(url, params=params)
+        if cls.cache is None:
+            return cls.request(url, params)
+
+        key = cls.cache.key(url, params)
+        if cls.cache.fresh(key):
+            metrics.count('http_cache_hits')
+            future = Future()
+            future.set_result(cls.cache.cached_response())
+        else:
+            future = cls.request(url, params, cls.cache.headers(key))
+        future.cache_key = key
+        return future
+
+    @classmethod
+    def request(cls, url, params=None, headers=None):
+        future = cls.get_transport().submit(url, params, headers)
+        future.add_done_callback(cls.count_response)
+        return future
+
+    @staticmethod
+    def count_response(future):
+        try:
+            status = future.result().status_code
+        except Exception:
+            status = 'error'
+        metrics.count('responses', status=status)
 
     @staticmethod
-    def get_result(future):
+    def not_modified(future):
+        try:
+            return future.result().status_code == 304
+        except Exception:
+            return False
+
+    @classmethod
+    def get_content(cls, future):
         try:
             response = future.result()
             response.raise_for_status()
-            return response.json()
-        except Exception:
-            raise RetreivalError('Error retreiving forecast')
+            if response.status_code == 304:
+                cls.cache.refresh(future.cache_key, response)
+                return cls.cache.body(future.cache_key)
+            if cls.cache is not None:
+                cls.cache.store(future.cache_key, response)
+            return response.content
+        except Exception as e:
+            metrics.count('retrieval_errors')
+            raise RetreivalError(
+                'Error retreiving forecast: {}'.format(describe_error(e)))
+
+    @classmethod
+    def get_result(cls, future):
+        return cls.parse(cls.get_content(future))
+
+    @staticmethod
+    def parse(content):
+        try:
+            with metrics.span('parse'):
+                return json.loads(content)
+        except ValueError:
+            metrics.count('retrieval_errors')
+            raise RetreivalError('Error decoding forecast')
 
 
 class Forecast(ABC):
@@ -71,79 +206,204 @@ class Forecast(ABC):
 
     def __init__(self, datafile, weather):
         self.datafile = datafile
+        self.lock_file = os.path.splitext(datafile)[0] + '.lock'
         self.weather = weather
         self.needs_update = False
         self.data = None
+        self.table = None
         self.status = True
 
     @staticmethod
     def get_time(time_string):
-        return pendulum.parse(time_string, tz=TIMEZONE)
+        return parse_time(time_string, TIMEZONE)
 
     @staticmethod
     def get_date(date_string):
-        return pendulum.parse(date_string.strip('Z'), tz='UTC')
+        return parse_date(date_string)
 
     def load(self):
         try:
             with open(self.datafile) as f:
                 self.data = json.load(f)
-                self.set_forecast()
-        except IOError:
+            self.set_forecast()
+            self.process_forecast()
+        except (IOError, ValueError):
+            self.data = None
             self.needs_update = True
 
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def reload(self, location):
+        self.needs_update = False
+        with metrics.span('load', forecast=self.name):
+            self.load()
+        self.check_location(location)
+
+    @contextmanager
+    def lock(self):
+        start = time.perf_counter()
+        with locked(self.lock_file):
+            metrics.record(
+                'lock_wait', time.perf_counter() - start, forecast=self.name)
+            yield
+
+    def refresh_required(self, no_updates):
+        return self.needs_update or (
+            not no_updates and self.check_required())
+
+    def refresh(self, location, no_updates, force=False):
+        with self.lock():
+            # Another process may have refreshed it while we waited
+            self.reload(location)
+            if not no_updates:
+                self.start_check_for_updates(force)
+                self.complete_check_for_updates()
+            if self.needs_update:
+                self.start_update()
+                self.complete_update()
+
     def start_update(self):
         logger.info('getting forecast {}'.format(type(self).__name__))
+        self.update_started = time.perf_counter()
         self.future = self.get_data()
 
     def complete_update(self):
+        content = self.receive_update()
+        if content is None:
+            return
+
         try:
-            self.data = WeatherClient.get_result(self.future)
+            data = WeatherClient.parse(content)
+            self.check_schema(data)
             logger.info('Updated forecast {}'.format(type(self).__name__))
         except RetreivalError:
             logger.error('Could not update {}'.format(type(self).__name__))
             self.status = False
+        except SchemaError as e:
+            self.schema_error(e)
         else:
+            self.set_data(data)
+
+    def receive_update(self):
+        try:
+            if self.data is not None and WeatherClient.not_modified(
+                    self.future):
+                WeatherClient.cache.refresh(
+                    self.future.cache_key, self.future.result())
+                logger.info(
+                    'Forecast not modified {}'.format(type(self).__name__))
+                return None
+            return WeatherClient.get_content(self.future)
+        except RetreivalError as e:
+            logger.error('Could not update {}: {}'.format(
+                type(self).__name__, e))
+            self.status = False
+            return None
+        finally:
+            metrics.record(
+                'download', time.perf_counter() - self.update_started,
+                forecast=self.name)
+
+    def schema_error(self, e):
+        logger.error('Could not update {}: {}'.format(type(self).__name__, e))
+        metrics.count('schema_errors', forecast=self.name)
+        self.status = False
+
+    def check_schema(self, data):
+        self.time_path(data)
+        self.forecast_path(data)
+
+    def set_data(self, data):
+        self.data = data
+        with metrics.span('archive', forecast=self.name):
+            self.archive_issue()
+        with metrics.span('process', forecast=self.name):
             self.set_forecast()
             self.process_forecast()
+        with metrics.span('write', forecast=self.name):
             self.write()
 
+    def get_archive(self):
+        return ForecastArchive(self.weather.archive_dir, self.archive_stream)
+
+    def archive_issue(self):
+        try:
+            self.get_archive().append(self.time().timestamp(), self.data)
+        except OSError as e:
+            logger.error('Could not archive {}: {}'.format(
+                type(self).__name__, e))
+
+    def load_issue(self, when):
+        issue = self.get_archive().at(when.timestamp())
+        if issue is None:
+            return False
+        self.data = issue[1]
+        self.set_forecast()
+        self.process_forecast()
+        return True
+
+    def share(self, other):
+        self.data = other.data
+        self.set_forecast()
+        self.table = other.table
+        self.write()
+
     def time(self):
-        return self.get_time(dpath.get(self.data, self.time_path))
+        return self.get_time(self.time_path(self.data))
 
-    def start_check_for_updates(self):
+    def start_check_for_updates(self, force=False):
         self.update_future = None
 
         if self.needs_update:
             return True
-        age = (pendulum.now() - self.time()).as_interval()
-        if age > self.updatedelta:
+        if force or self.check_required():
             logger.info(
                 'check for updates required {}'.format(type(self).__name__))
+            self.check_started = time.perf_counter()
             self.update_future = self.get_update_time_data()
 
+    def check_required(self):
+        if self.needs_update:
+            return False
+        return now() - self.time() > self.updatedelta
+
     def complete_check_for_updates(self):
         if self.update_future is None:
             return
 
         try:
             result = WeatherClient.get_result(self.update_future)
+            self.update_time_path(result)
             logger.info('Retrived update times {}'.format(type(self).__name__))
-        except RetreivalError:
-            logger.error(
-                'Could not get update times {}'.format(type(self).__name__))
+        except RetreivalError as e:
+            logger.error('Could not get update times {}: {}'.format(
+                type(self).__name__, e))
+            self.status = False
+        except SchemaError as e:
+            logger.error('Could not get update times {}: {}'.format(
+                type(self).__name__, e))
+            metrics.count('schema_errors', forecast=self.name)
             self.status = False
         else:
-            new_time = self.get_time(dpath.get(result, self.update_time_path))
-            if new_time > self.time():
-                logger.info('update available {}'.format(type(self).__name__))
-                self.needs_update = True
+            self.check_update_time(result)
+        finally:
+            metrics.record(
+                'check', time.perf_counter() - self.check_started,
+                forecast=self.name)
+
+    def check_update_time(self, result):
+        new_time = self.get_time(self.update_time_path(result))
+        if new_time > self.time():
+            logger.info('update available {}'.format(type(self).__name__))
+            self.needs_update = True
 
     def set_forecast(self):
-        self.forecast = dpath.get(self.data, self.forecast_path)
+        self.forecast = self.forecast_path(self.data)
 
     def write(self):
-        with open(self.datafile, 'w') as f:
+        with atomic_write(self.datafile) as f:
             json.dump(self.data, f, ensure_ascii=False)
 
     def process_forecast(self):
@@ -153,92 +413,214 @@ class Forecast(ABC):
     def check_location(self, site_name):
         pass
 
+    def get_update_time_data(self):
+        return WeatherClient.get(*self.update_time_request())
+
+    def get_data(self):
+        return WeatherClient.get(*self.data_request())
+
     @abstractmethod
-    def get_update_time_data(self, site_name):
+    def update_time_request(self):
         pass
 
     @abstractmethod
-    def get_data(self, site_name):
+    def data_request(self):
         pass
 
 
 class DailyForecast(Forecast):
-    updatedelta = pendulum.Interval(minutes=100)
-    update_time_path = 'Resource/dataDate'
-    time_path = 'SiteRep/DV/dataDate'
-    forecast_path = 'SiteRep/DV/Location'
+    updatedelta = timedelta(minutes=100)
+    update_time_path = KeyPath('Resource/dataDate')
+    time_path = KeyPath('SiteRep/DV/dataDate')
+    forecast_path = KeyPath('SiteRep/DV/Location')
     res = 'daily'
+    fields = (
+        ('$', DAY_NIGHT), ('D', COMPASS), ('Dm', None), ('FDm', None),
+        ('FNm', None), ('Gm', None), ('Gn', None), ('Hm', None), ('Hn', None),
+        ('Nm', None), ('PPd', None), ('PPn', None), ('S', None), ('U', None),
+        ('V', VISIBILITY), ('W', None))
+
+    def __init__(self, datafile, weather):
+        super().__init__(datafile, weather)
+        self.table_file = os.path.splitext(datafile)[0] + '.bin'
+
+    def load(self):
+        try:
+            self.data, self.table = read_table(self.table_file)
+            self.set_forecast()
+        except (IOError, ValueError):
+            self.migrate()
+
+    def migrate(self):
+        # JSON files from before table files may hold display strings
+        # rather than DataPoint values, and are refetched instead
+        super().load()
+        if self.data is not None:
+            logger.info('Converting {} to {}'.format(
+                self.datafile, self.table_file))
+            self.write()
+
+    def remove_legacy(self):
+        try:
+            os.remove(self.datafile)
+        except FileNotFoundError:
+            pass
+        else:
+            logger.info('Replaced {} with {}'.format(
+                self.datafile, self.table_file))
+
+    @property
+    def archive_stream(self):
+        return '{}-{}'.format(self.weather.site_id, self.res)
+
+    def data_request(self):
+        return WeatherClient.url(MAIN_PATH, self.weather.site_id), {
+            'res': self.res}
+
+    def table_request(self):
+        return WeatherClient.url(
+            TABLE_PATH, MAIN_PATH, self.weather.site_id), {'res': self.res}
+
+    def update_time_request(self):
+        return WeatherClient.url(MAIN_PATH, 'capabilities'), {
+            'res': self.res}
 
     def get_data(self):
-        return WeatherClient.get(
-            MAIN_URL + self.weather.site_id, params={'res': self.res})
+        if WeatherClient.shared_tables:
+            return WeatherClient.get(*self.table_request())
+        return super().get_data()
 
-    def get_update_time_data(self):
-        return WeatherClient.get(
-                MAIN_URL + 'capabilities', params={'res': self.res})
+    def complete_update(self):
+        if not WeatherClient.shared_tables:
+            return super().complete_update()
+        content = self.receive_update()
+        if content is None:
+            return
+        try:
+            self.set_table(content)
+            logger.info('Updated forecast {}'.format(type(self).__name__))
+        except ValueError as e:
+            self.schema_error(e)
 
     def check_location(self, site_name):
         if self.data is not None:
             if self.forecast['name'] != site_name.upper():
                 self.needs_update = True
+                self.data = None
 
     def process_forecast(self):
-        for period in self.forecast['Period']:
-            period['value'] = self.get_date(period['value']).format('%A:')
-            for rep in period['Rep']:
-                rep['W'] = WEATHER_TYPES[rep['W']].split('(')[0]
-                rep['V'] = VISIBILITY_TYPES[rep['V']]
-                for field in ['FDm', 'FNm', 'Gm', 'Gn']:
-                    if field in rep:
-                        rep[field] = f"({rep[field]})".rjust(4)
+        self.table = ForecastTable.from_periods(
+            self.forecast.pop('Period'), self.fields)
+
+    def write(self):
+        write_table(self.table_file, self.data, self.table)
+        self.remove_legacy()
+
+    def start_parse(self, pool, content):
+        return pool.submit(
+            parse_table, type(self), content, self.weather.archive_dir,
+            self.weather.site_id)
+
+    def complete_parse(self, job):
+        try:
+            with metrics.span('process', forecast=self.name):
+                data = job.result()
+            logger.info('Updated forecast {}'.format(type(self).__name__))
+        except RetreivalError:
+            logger.error('Could not update {}'.format(type(self).__name__))
+            self.status = False
+        except SchemaError as e:
+            self.schema_error(e)
+        else:
+            self.set_table(data)
+
+    def set_table(self, content):
+        with metrics.span('write', forecast=self.name):
+            with atomic_write(self.table_file, 'wb') as f:
+                f.write(content)
+            self.remove_legacy()
+        self.data, self.table = read_table(self.table_file)
+        self.set_forecast()
 
 
 class ThreeHourForecast(DailyForecast):
     res = '3hourly'
+    fields = (
+        ('$', None), ('D', COMPASS), ('F', None), ('G', None), ('H', None),
+        ('Pp', None), ('S', None), ('T', None), ('U', None),
+        ('V', VISIBILITY), ('W', None))
 
     def process_forecast(self):
-        for period in self.forecast['Period']:
-            day = self.get_date(period['value'])
-            for rep in period['Rep']:
-                rep['$'] = (
-                        day + pendulum.Interval(minutes=int(rep['$']))
-                ).in_tz(TIMEZONE).hour
-                rep['W'] = WEATHER_TYPES[rep['W']].split('(')[0]
-                rep['V'] = VISIBILITY_TYPES[rep['V']]
+        super().process_forecast()
 
-                rep['F'] = f"({rep['F']})".rjust(4)
-                rep['G'] = f"({rep['G']})".rjust(4)
+        hours = []
+        for i, value in enumerate(self.table.periods):
+            hours.extend(
+                local_hours(value, self.table.column('$', i), TIMEZONE))
+        self.table.add_column('hour', hours)
 
 
 class RegionalForecast(Forecast):
-    updatedelta = pendulum.Interval(hours=12)
-    update_time_path = 'RegionalFcst/issuedAt'
-    time_path = 'RegionalFcst/issuedAt'
-    forecast_path = 'RegionalFcst/FcstPeriods/Period'
+    updatedelta = timedelta(hours=12)
+    update_time_path = KeyPath('RegionalFcst/issuedAt')
+    time_path = KeyPath('RegionalFcst/issuedAt')
+    forecast_path = KeyPath('RegionalFcst/FcstPeriods/Period')
 
-    def get_data(self):
-        return WeatherClient.get(TEXT_URL + self.weather.region_id)
+    @property
+    def archive_stream(self):
+        return 'region-{}'.format(self.weather.region_id)
 
-    def get_update_time_data(self):
-        return WeatherClient.get('/'.join([TEXT_URL, 'capabilities']))
+    def data_request(self):
+        return WeatherClient.url(TEXT_PATH, self.weather.region_id), None
+
+    def update_time_request(self):
+        return '/'.join(
+            [WeatherClient.url(TEXT_PATH), 'capabilities']), None
 
     def check_location(self, region):
         if self.data is not None:
             if self.data['RegionalFcst']['regionId'] != region:
                 self.needs_update = True
+                self.data = None
+
+
+def parse_table(cls, content, archive_dir, site_id):
+    fc = cls('', SimpleNamespace(archive_dir=archive_dir, site_id=site_id))
+    data = WeatherClient.parse(content)
+    fc.check_schema(data)
+    fc.data = data
+    if archive_dir is not None:
+        fc.archive_issue()
+    fc.set_forecast()
+    fc.process_forecast()
+    return table_bytes(fc.data, fc.table)
 
 
 class WeatherForecast(object):
 
-    def __init__(self, api_key, site_name, datadir):
+    def __init__(self, api_key, site_name, datadir, coordinates=None):
         self.datadir = datadir
         self.site_file = '{}/met-loc-site-id.json'.format(datadir)
+        self.index_file = '{}/met-site-index.json'.format(datadir)
+        self.archive_dir = '{}/archive'.format(datadir)
+        self.start_date = None
 
         WeatherClient.api_key = api_key
+        if WeatherClient.cache is None:
+            WeatherClient.cache = HTTPCache(
+                os.path.join(datadir, 'http-cache'))
         self.site_name = site_name
         self.site_id = None
 
+        if coordinates is None and site_name is not None:
+            coordinates = parse_coordinates(site_name)
+        self.coordinates = coordinates
+
     def load_site_id_and_region(self):
+        if self.coordinates is not None:
+            self.set_site(self.get_nearest_sites(*self.coordinates)[0])
+            return
+
         try:
             with open(self.site_file) as f:
                 data = json.load(f)
@@ -259,148 +641,221 @@ class WeatherForecast(object):
                 self.region_name = data['region_name']
                 self.region_id = data['region_id']
 
-    @staticmethod
-    def get_site_info(site):
-        if 'unitaryAuthArea' not in site:
-            site['unitaryAuthArea'] = ''
-        site['latitude'] = float(site['latitude'])
-        site['longitude'] = float(site['longitude'])
-
-        site['description'] = (
-            '{name} - {unitaryAuthArea} '
-            '{latitude:+.2f}{longitude:+.2f}/'
-        ).format(**site)
-        return site
-
-    @staticmethod
-    def process_name(name):
-        return re.sub(r"[-.()& ]'", '', name.strip().lower())
+    get_site_info = staticmethod(get_site_info)
+    process_name = staticmethod(process_name)
 
-    def get_matching_sites(self, site_name, site_data):
-        site_name = self.process_name(site_name)
+    def get_site_index(self):
+        index = SiteIndex.load(self.index_file)
+        if index is None:
+            logger.info('Building site index')
+            index = SiteIndex.build(*self.get_site_lists())
+            index.save(self.index_file)
+        return index
 
-        for site in site_data:
-            site['processed_name'] = self.process_name(site['name'])
+    def get_matching_sites(self, site_name, index=None):
+        if index is None:
+            index = self.get_site_index()
+        return index.match(site_name)
 
-        exact_matches = [
-            self.get_site_info(s) for s in site_data
-            if s['processed_name'] == site_name]
+    def get_nearest_sites(self, latitude, longitude, k=1, index=None):
+        if index is None:
+            index = self.get_site_index()
+        return index.nearest(latitude, longitude, k)
 
-        if exact_matches:
-            return exact_matches
+    @staticmethod
+    def get_site_lists():
+        sites_future = WeatherClient.get(
+            WeatherClient.url(MAIN_PATH, 'sitelist'))
+        regions_future = WeatherClient.get(
+            WeatherClient.url(TEXT_PATH, 'sitelist'))
 
-        matches = [
-            self.get_site_info(s) for s in site_data
-            if s['processed_name'].startswith(site_name)]
+        sites = WeatherClient.get_result(sites_future)['Locations']['Location']
+        regions = WeatherClient.get_result(
+            regions_future)['Locations']['Location']
+        return sites, regions
 
-        return sorted(matches, key=lambda x: len(x['processed_name']))
+    @staticmethod
+    def choose_site(matches):
+        if len(matches) == 1:
+            return matches[0]
+
+        more_than_ten = len(matches) <= 10
+        print(
+            'More than {} site{} found:\n'
+            'Please select from below'.format(
+                    1 if more_than_ten else 10,
+                    '' if more_than_ten else 's'))
+        print('\n'.join((
+            f"{i}) {m['description']}"
+            for i, m in enumerate(matches, 1))))
+
+        while True:
+            result = input('Select a site by number (default 1)>')
+            if not result.strip():
+                result = 1
+            try:
+                result = int(result)
+            except ValueError:
+                if result.strip() == 'q':
+                    sys.exit()
+                continue
+            try:
+                assert result >= 1
+                assert result <= min((len(matches), 10))
+            except AssertionError:
+                continue
+            return matches[result - 1]
 
     def get_site_id_and_region(self):
         logger.info('Searching for sites matching {}'.format(self.site_name))
 
-        sites_future = WeatherClient.get(MAIN_URL + 'sitelist')
-        regions_future = WeatherClient.get(TEXT_URL + 'sitelist')
-
-        sites = WeatherClient.get_result(sites_future)['Locations']['Location']
-        regions = WeatherClient.get_result(
-            regions_future)['Locations']['Location']
-
-        matches = self.get_matching_sites(self.site_name, sites)
+        matches = self.get_matching_sites(self.site_name)
         if not matches:
             logger.error('No site matching {} found'.format(self.site_name))
             sys.exit()
 
-        if len(matches) == 1:
-            site = matches[0]
-        else:
-            more_than_ten = len(matches) <= 10
-            print(
-                'More than {} site{} found:\n'
-                'Please select from below'.format(
-                        1 if more_than_ten else 10,
-                        '' if more_than_ten else 's'))
-            print('\n'.join((
-                f"{i}) {m['description']}"
-                for i, m in enumerate(matches, 1))))
-
-            while True:
-                result = input('Select a site by number (default 1)>')
-                if not result.strip():
-                    result = 1
-                try:
-                    result = int(result)
-                except ValueError:
-                    if result.strip() == 'q':
-                        sys.exit()
-                    continue
-                try:
-                    assert result >= 1
-                    assert result <= min((len(matches), 10))
-                except AssertionError:
-                    continue
-                site = matches[result - 1]
-                break
+        self.set_site(self.choose_site(matches))
 
+    def set_site(self, site):
         self.site_name = site['name']
         self.site_id = site['id']
         self.region_name = site['region']
+        self.region_id = site['region_id']
 
-        for region in regions:
-            if region['@name'] == self.region_name:
-                self.region_id = region['@id']
-                break
-        else:
+        if self.region_id is None:
             raise Exception('Region {} not found'.format(self.region_name))
 
-        with open(self.site_file, 'w') as f:
+        with atomic_write(self.site_file) as f:
             json.dump({
                 'name': self.site_name,
                 'site_id': self.site_id,
                 'region_id': self.region_id,
                 'region_name': self.region_name,
+                'coordinates': self.coordinates and list(self.coordinates),
                 }, f, ensure_ascii=False)
 
     def load(self, no_updates=False):
-        self.get_data(no_updates)
-        self.hourly = self.forecasts['hourly'].data
-        self.hourly_fcs = self.forecasts['hourly'].forecast
-        self.daily = self.forecasts['daily'].data
-        self.daily_fcs = self.forecasts['daily'].forecast
-        self.regional = self.forecasts['regional'].data
-        self.reg_fcs = self.forecasts['regional'].forecast
-
-    def get_data(self, no_updates=False):
-
+        self.no_updates = no_updates
         self.load_site_id_and_region()
+        self.create_forecasts()
 
+    def prefetch(self):
+        def run():
+            for kind in self.forecasts:
+                try:
+                    self.get_forecast(kind)
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def get_forecast(self, kind):
+        fc = self.forecasts[kind]
+        with self.locks[kind]:
+            if kind in self.errors:
+                raise self.errors[kind]
+            if kind not in self.ready:
+                try:
+                    self.refresh_forecast(kind)
+                except Exception as e:
+                    self.errors[kind] = e
+                    raise
+        return fc
+
+    def refresh_forecast(self, kind):
+        fc = self.forecasts[kind]
+        fc.reload(self.locations[kind])
+        missing_forecast = fc.needs_update
+
+        if fc.refresh_required(self.no_updates):
+            fc.refresh(self.locations[kind], self.no_updates)
+        self.check_status(missing_forecast, [fc])
+        self.ready.add(kind)
+
+    @property
+    def hourly(self):
+        return self.get_forecast('hourly').data
+
+    @property
+    def hourly_fcs(self):
+        return self.get_forecast('hourly').table
+
+    @property
+    def daily(self):
+        return self.get_forecast('daily').data
+
+    @property
+    def daily_fcs(self):
+        return self.get_forecast('daily').table
+
+    @property
+    def regional(self):
+        return self.get_forecast('regional').data
+
+    @property
+    def reg_fcs(self):
+        return self.get_forecast('regional').forecast
+
+    def create_forecasts(self):
         datafile = self.datadir + '/met{}.json'
         self.forecasts = {
             'hourly': ThreeHourForecast(datafile.format('3hour'), self),
             'daily': DailyForecast(datafile.format('daily'), self),
             'regional': RegionalForecast(datafile.format('regional'), self)}
+        self.locations = {
+            'hourly': self.site_name,
+            'daily': self.site_name,
+            'regional': self.region_name}
+        self.locks = {kind: threading.Lock() for kind in self.forecasts}
+        self.ready = set()
+        self.errors = {}
+
+    def load_archived(self, when):
+        self.no_updates = True
+        self.load_site_id_and_region()
+        self.create_forecasts()
+        for kind, fc in self.forecasts.items():
+            if not fc.load_issue(when):
+                raise Exception('No {} forecast for {} archived by {}'.format(
+                    kind, self.locations[kind], when.isoformat()))
+        self.ready.update(self.forecasts)
+        self.start_date = parse_date(self.hourly_fcs.periods[0]).date()
+
+    def make_forecasts(self):
+        self.create_forecasts()
+        for kind, fc in self.forecasts.items():
+            fc.reload(self.locations[kind])
 
-        for f in self.forecasts.values():
-            f.load()
+    def get_data(self, no_updates=False):
+        with metrics.span('site_refresh'):
+            self.refresh_all(no_updates)
 
-        self.forecasts['hourly'].check_location(self.site_name)
-        self.forecasts['daily'].check_location(self.site_name)
-        self.forecasts['regional'].check_location(self.region_name)
+    def refresh_all(self, no_updates):
+        self.no_updates = no_updates
+        self.load_site_id_and_region()
+        self.make_forecasts()
 
         missing_forecasts = any([
             fc.needs_update for fc in self.forecasts.values()])
 
-        if not no_updates:
-            for fc in self.forecasts.values():
-                fc.start_check_for_updates()
-            for fc in self.forecasts.values():
-                fc.complete_check_for_updates()
-
-        to_update = [fc for fc in self.forecasts.values() if fc.needs_update]
-        for fc in to_update:
-            fc.start_update()
-        for fc in to_update:
-            fc.complete_update()
-        if not all([f.status for f in self.forecasts.values()]):
+        stale = [
+            kind for kind, fc in self.forecasts.items()
+            if fc.refresh_required(no_updates)]
+        if stale:
+            with ThreadPoolExecutor(len(stale)) as pool:
+                list(pool.map(
+                    lambda kind: self.forecasts[kind].refresh(
+                        self.locations[kind], no_updates),
+                    stale))
+        self.check_status(missing_forecasts)
+        self.ready.update(self.forecasts)
+
+    def check_status(self, missing_forecasts, forecasts=None):
+        if forecasts is None:
+            forecasts = self.forecasts.values()
+        if not all([f.status for f in forecasts]):
             if missing_forecasts:
                 raise Exception('Could not retreive forecasts')
             else:
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from pymetweather.codes import VISIBILITY_TYPES, WEATHER_NAMES
+
+HOURLY_COLUMNS = [
+    (['Time'], 5, '{$:02}:00'),
+    (['Conditions'], 22, '{W}'),
+    (['Precipitation', 'probability'], 15, '{Pp:>3} %'),
+    (['Temperature', '(Feels Like)'], 14, '{T:>2} {F} °C'),
+    (['Wind Speed', '(Gust)'], 16, '{S:>2} {G} mph'),
+    (['Wind', 'Direction'], 12, '{D:>3}'),
+    (['Relative', 'Humidity'], 10, '{H} %'),
+    (['Visibility'], 12, '{V}'),
+    (['UV', 'Index'], 7, '{U}')]
+
+DAILY_COLUMNS = [
+    (['Day'], 13, '{$}', '{$}'),
+    (['Conditions'], 22, '{W}', '{W}'),
+    (['Precipitation', 'probability'], 15,
+     '{PPd:>3} %', '{PPn:>3} %'),
+    (['Max day/', 'Min night', 'Temperature', '(Feels like)'], 14,
+     '{Dm:>2} {FDm} °C', '{Nm:>2} {FNm} °C'),
+    (['Wind Speed', '(Gust)'], 16,
+     '{S:>2} {Gn} mph', '{S:>2} {Gm} mph'),
+    (['Wind', 'Direction'], 12, '{D:>3}', '{D:>3}'),
+    (['Relative', 'Humidity'], 10, '{Hn} %', '{Hm} %'),
+    (['Visibility'], 12, '{V}', '{V}')]
+
+SEPARATOR = '\x1f'
+
+
+class RowFormatter(object):
+    def __init__(self, cells):
+        self.cells = cells
+        self.template = SEPARATOR.join(cell for cell, width, align in cells)
+        self.line = ''.join(
+            '{{:{}{}}}'.format(align, width) for cell, width, align in cells)
+
+    def __call__(self, rep):
+        return self.line.format(*self.template.format(**rep).split(SEPARATOR))
+
+
+def header_lines(columns):
+    rows = max([len(c[0]) for c in columns])
+    return [
+        ''.join(
+            '{:^{}}'.format(c[0][i] if i < len(c[0]) else '', c[1])
+            for c in columns)
+        for i in range(rows)]
+
+
+def table_width(columns):
+    return sum([c[1] for c in columns])
+
+
+HOURLY_HEADER = header_lines(HOURLY_COLUMNS)
+DAILY_HEADER = header_lines(DAILY_COLUMNS)
+
+hourly_row = RowFormatter([(c[2], c[1], '^') for c in HOURLY_COLUMNS])
+
+daily_rows = [
+    RowFormatter(
+        [(DAILY_COLUMNS[0][n], DAILY_COLUMNS[0][1] - 3, '>'), ('', 3, '')] +
+        [(c[n], c[1], '^') for c in DAILY_COLUMNS[1:]])
+    for n in (2, 3)]
+
+
+def decode_rep(row):
+    rep = dict(row)
+    if row['W'] is not None:
+        rep['W'] = WEATHER_NAMES[row['W']]
+    if row['V'] is not None:
+        rep['V'] = VISIBILITY_TYPES[row['V']]
+    return rep
+
+
+def display_rep(row, bracketed):
+    rep = {k: '' if v is None else v for k, v in decode_rep(row).items()}
+    for field in bracketed:
+        if row[field] is not None:
+            rep[field] = f"({row[field]})".rjust(4)
+    return rep
+
+
+def hourly_rep(row):
+    rep = display_rep(row, ['F', 'G'])
+    rep['$'] = row['hour']
+    return rep
+
+
+def daily_rep(row):
+    return display_rep(row, ['FDm', 'FNm', 'Gm', 'Gn'])
+
+
+def day_name(value):
+    return datetime.strptime(value, '%Y-%m-%dZ').strftime('%A:')
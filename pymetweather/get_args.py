@@ -3,6 +3,17 @@ from configparser import RawConfigParser
 from os import mkdir
 import os.path
 
+from pymetweather.forecasts import TIMEZONE
+from pymetweather.timeparse import parse_time
+
+
+def issue_time(value):
+    try:
+        return parse_time(value, TIMEZONE)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            'invalid time {!r}, expected e.g. 2026-10-17T09:00'.format(value))
+
 
 def get_command_line_args():
     parser = argparse.ArgumentParser(description=(
@@ -32,13 +43,90 @@ def get_command_line_args():
         help='check for updates and quit'
     )
 
+    parser.add_argument(
+        '-f',
+        '--format',
+        choices=['text', 'jsonl', 'csv'],
+        help='write the forecasts to stdout in this format instead of '
+        'starting the curses interface'
+    )
+
+    parser.add_argument(
+        '-i',
+        '--issued',
+        metavar='TIME',
+        type=issue_time,
+        help='show the archived forecasts issued at or before this time, '
+        'e.g. 2026-10-17T09:00, instead of the latest'
+    )
+
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='keep running and refresh the forecasts as they are published'
+    )
+
+    parser.add_argument(
+        '--serve',
+        metavar='[HOST:]PORT',
+        help='run a shared forecast cache server on this address'
+    )
+    parser.add_argument(
+        '--server',
+        help='URL of a shared forecast cache server to use instead of '
+        'DataPoint'
+    )
+
+    parser.add_argument(
+        '-a',
+        '--alerts',
+        metavar='RULES',
+        help='write the alerts raised by the rules in this file to stdout '
+        'as JSON lines, in daemon or sites file mode'
+    )
+
+    parser.add_argument(
+        '-m',
+        '--metrics',
+        metavar='FILE',
+        help='write timings and counters to this file on exit (and after '
+        'each check in daemon mode); JSON if it ends in .json, otherwise '
+        'Prometheus text format'
+    )
+
+    parser.add_argument(
+        '-s',
+        '--sites-file',
+        dest='sites_file',
+        help='update the forecasts for every site listed in this file and quit'
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        help='number of concurrent downloads (default 10)'
+    )
+    parser.add_argument(
+        '-p',
+        '--processes',
+        type=int,
+        default=0,
+        help='number of worker processes to parse forecasts in when updating '
+        'a sites file'
+    )
+
     return vars(parser.parse_args())
 
 
 def get_config_args():
     cp = RawConfigParser({
         'api_key': '',
-        'datadir': os.path.expanduser('~/.metweather')})
+        'server': '',
+        'datadir': os.path.expanduser('~/.metweather'),
+        'workers': '10',
+        'timeout': '30',
+        'retries': '3',
+        'rate_limit': '100'})
 
     if os.path.isfile(os.path.expanduser('~/.metweatherrc')):
         cp.read([os.path.expanduser('~/.metweatherrc')])
@@ -46,10 +134,14 @@ def get_config_args():
     else:
         args = cp.defaults()
 
-    if not args['api_key']:
+    if not (args['api_key'] or args['server']):
         raise Exception("No API key given")
 
     args['datadir'] = os.path.expanduser(args['datadir'])
+    args['workers'] = int(args['workers'])
+    args['timeout'] = float(args['timeout'])
+    args['retries'] = int(args['retries'])
+    args['rate_limit'] = float(args['rate_limit'])
 
     if not os.path.isdir(args['datadir']):
         mkdir(args['datadir'])
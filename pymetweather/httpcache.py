@@ -0,0 +1,93 @@
+from hashlib import sha1
+import json
+import os
+import os.path
+import re
+import time
+
+from pymetweather.storage import atomic_write
+
+
+class CachedResponse(object):
+    status_code = 304
+    headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class HTTPCache(object):
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @staticmethod
+    def key(url, params=None):
+        params = sorted(
+            (k, str(v)) for k, v in (params or {}).items() if k != 'key')
+        return sha1(json.dumps([url, params]).encode('utf-8')).hexdigest()
+
+    def path(self, key, ext):
+        return os.path.join(self.directory, '{}.{}'.format(key, ext))
+
+    def get_meta(self, key):
+        try:
+            with open(self.path(key, 'json')) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def headers(self, key):
+        meta = self.get_meta(key)
+        headers = {}
+        if meta is not None:
+            if meta['etag']:
+                headers['If-None-Match'] = meta['etag']
+            if meta['last_modified']:
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def fresh(self, key):
+        meta = self.get_meta(key)
+        return meta is not None and meta['expires'] > time.time()
+
+    @staticmethod
+    def max_age(cache_control):
+        if 'no-store' in cache_control or 'no-cache' in cache_control:
+            return None
+        match = re.search(r'max-age=(\d+)', cache_control)
+        return int(match.group(1)) if match else 0
+
+    def store(self, key, response):
+        max_age = self.max_age(response.headers.get('Cache-Control', ''))
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if max_age is None or not (etag or last_modified or max_age):
+            return
+
+        with atomic_write(self.path(key, 'body'), 'wb') as f:
+            f.write(response.content)
+        with atomic_write(self.path(key, 'json')) as f:
+            json.dump({
+                'url': response.url.split('?')[0],
+                'etag': etag,
+                'last_modified': last_modified,
+                'expires': time.time() + max_age,
+            }, f)
+
+    def refresh(self, key, response):
+        max_age = self.max_age(response.headers.get('Cache-Control', ''))
+        meta = self.get_meta(key)
+        if meta is not None and max_age:
+            meta['expires'] = time.time() + max_age
+            with atomic_write(self.path(key, 'json')) as f:
+                json.dump(meta, f)
+
+    def body(self, key):
+        with open(self.path(key, 'body'), 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def cached_response():
+        return CachedResponse()
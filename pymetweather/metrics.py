@@ -0,0 +1,112 @@
+from contextlib import contextmanager
+import json
+import threading
+import time
+
+from pymetweather.storage import atomic_write
+
+PREFIX = 'pymetweather_'
+
+
+def label_key(name, labels):
+    # Values are strings so mixed labels such as status=200 and
+    # status='error' still sort
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def label_text(labels):
+    if not labels:
+        return ''
+    return '{{{}}}'.format(','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+        for k, v in labels))
+
+
+class Metrics(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.spans = {}
+        self.hooks = []
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def count(self, name, value=1, **labels):
+        key = label_key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        for hook in self.hooks:
+            hook('counter', name, value, labels)
+
+    def record(self, name, seconds, **labels):
+        key = label_key(name, labels)
+        with self.lock:
+            count, total, longest = self.spans.get(key, (0, 0.0, 0.0))
+            self.spans[key] = (count + 1, total + seconds,
+                               max(longest, seconds))
+        for hook in self.hooks:
+            hook('span', name, seconds, labels)
+
+    @contextmanager
+    def span(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.spans = {}
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(
+                        self.counters.items())],
+                'spans': [
+                    {'name': name, 'labels': dict(labels), 'count': count,
+                     'seconds': total, 'max_seconds': longest}
+                    for (name, labels), (count, total, longest) in sorted(
+                        self.spans.items())]}
+
+    def to_prometheus(self):
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            spans = sorted(self.spans.items())
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = PREFIX + name + '_total'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append('# TYPE {} counter'.format(metric))
+            lines.append('{}{} {}'.format(metric, label_text(labels), value))
+
+        for (name, labels), (count, total, longest) in spans:
+            metric = PREFIX + name + '_seconds'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append('# TYPE {} summary'.format(metric))
+            labels = label_text(labels)
+            lines.append('{}_count{} {}'.format(metric, labels, count))
+            lines.append('{}_sum{} {:.6f}'.format(metric, labels, total))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        with atomic_write(path) as f:
+            if path.endswith('.json'):
+                json.dump(self.to_dict(), f, indent=1)
+            else:
+                f.write(self.to_prometheus())
+
+
+metrics = Metrics()
@@ -0,0 +1,94 @@
+import csv
+from datetime import datetime
+import json
+from textwrap import fill
+
+from pymetweather.formatting import (
+    DAILY_HEADER, HOURLY_HEADER, daily_rep, daily_rows, day_name,
+    decode_rep, hourly_rep, hourly_row)
+
+TEXT_WIDTH = 79
+
+
+def paragraphs(reg_fcs):
+    for period in reg_fcs:
+        paras = period['Paragraph']
+        if isinstance(paras, dict):
+            paras = [paras]
+        for para in paras:
+            yield period['id'], para['title'], para['$']
+
+
+def records(weather):
+    for kind, table in [
+            ('hourly', weather.hourly_fcs), ('daily', weather.daily_fcs)]:
+        for i, period in enumerate(table.periods):
+            for row in table.rows(i):
+                record = {
+                    'site': weather.site_name, 'forecast': kind,
+                    'date': period.rstrip('Z')}
+                record.update(decode_rep(row))
+                yield record
+
+    for period, title, text in paragraphs(weather.reg_fcs):
+        yield {
+            'site': weather.site_name, 'forecast': 'regional',
+            'period': period, 'title': title, 'text': text}
+
+
+def text_lines(weather):
+    yield 'Weather for {}'.format(weather.site_name)
+
+    table = weather.hourly_fcs
+    for i, period in enumerate(table.periods):
+        yield ''
+        yield datetime.strptime(period, '%Y-%m-%dZ').strftime('%A %d %B %Y')
+        for line in HOURLY_HEADER:
+            yield line.rstrip()
+        for row in table.rows(i):
+            yield hourly_row(hourly_rep(row)).rstrip()
+
+    yield ''
+    for line in DAILY_HEADER:
+        yield line.rstrip()
+    table = weather.daily_fcs
+    for i, period in enumerate(table.periods):
+        yield day_name(period)
+        for j, row in enumerate(table.rows(i)):
+            yield daily_rows[j](daily_rep(row)).rstrip()
+
+    for period, title, text in paragraphs(weather.reg_fcs):
+        yield ''
+        yield fill(title + ' ' + text, TEXT_WIDTH)
+
+
+def jsonl_lines(weather):
+    for record in records(weather):
+        yield json.dumps(record, ensure_ascii=False)
+
+
+class LineWriter(object):
+    def write(self, line):
+        return line
+
+
+def csv_lines(weather):
+    # One header for every forecast, with the columns a record lacks left
+    # empty, so the whole stream reads as a single table
+    rows = list(records(weather))
+    fieldnames = list(dict.fromkeys(k for row in rows for k in row))
+    writer = csv.DictWriter(
+        LineWriter(), fieldnames, restval='', lineterminator='')
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(
+            {k: '' if v is None else v for k, v in row.items()})
+
+
+FORMATS = {'text': text_lines, 'jsonl': jsonl_lines, 'csv': csv_lines}
+
+
+def write_forecasts(weather, format, stream):
+    for line in FORMATS[format](weather):
+        stream.write(line)
+        stream.write('\n')
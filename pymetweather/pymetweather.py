@@ -1,46 +1,46 @@
 import curses
 from datetime import date, timedelta
+from functools import lru_cache
 import locale
+import os.path
+import sys
 from textwrap import fill
+import time
 
-from pymetweather.forecasts import WeatherForecast
+from pymetweather.forecasts import (
+    WeatherClient, WeatherForecast, hold_logging, logger, setup_logging)
+from pymetweather.formatting import (
+    DAILY_COLUMNS, DAILY_HEADER, HOURLY_COLUMNS, HOURLY_HEADER, daily_rep,
+    daily_rows, day_name, hourly_rep, hourly_row, table_width)
 from pymetweather.get_args import get_command_line_args, get_config_args
+from pymetweather.metrics import metrics
 
-locale.setlocale(locale.LC_ALL, '')
+
+@lru_cache(maxsize=256)
+def wrap(text, width):
+    return fill(text, width)
+
+
+class RenderedScreen(object):
+    def __init__(self, top_pad, top_maxy, tab_pad, tab_maxy, tab_maxx):
+        self.top_pad = top_pad
+        self.top_maxy = top_maxy
+        self.tab_pad = tab_pad
+        self.tab_maxy = tab_maxy
+        self.tab_maxx = tab_maxx
 
 
 class WeatherPrinter(object):
+    pad_width = 500
+
     def __init__(self, forecast, screen_width):
         self.fcs = forecast
 
-        self.cols = [
-            (['Time'], 5, '{$:02}:00'),
-            (['Conditions'], 22, '{W}'),
-            (['Precipitation', 'probability'], 15, '{Pp:>3} %'),
-            (['Temperature', '(Feels Like)'], 14, '{T:>2} {F} °C'),
-            (['Wind Speed', '(Gust)'], 16, '{S:>2} {G} mph'),
-            (['Wind', 'Direction'], 12, '{D:>3}'),
-            (['Relative', 'Humidity'], 10, '{H} %'),
-            (['Visibility'], 12, '{V}'),
-            (['UV', 'Index'], 7, '{U}')]
-
-        self.daily_cols = [
-            (['Day'], 13, '{$}', '{$}'),
-            (['Conditions'], 22, '{W}', '{W}'),
-            (['Precipitation', 'probability'], 15,
-             '{PPd:>3} %', '{PPn:>3} %'),
-            (['Max day/', 'Min night', 'Temperature', '(Feels like)'], 14,
-             '{Dm:>2} {FDm} °C', '{Nm:>2} {FNm} °C'),
-            (['Wind Speed', '(Gust)'], 16,
-             '{S:>2} {Gn} mph', '{S:>2} {Gm} mph'),
-            (['Wind', 'Direction'], 12, '{D:>3}', '{D:>3}'),
-            (['Relative', 'Humidity'], 10, '{Hn} %', '{Hm} %'),
-            (['Visibility'], 12, '{V}', '{V}')]
-
-        self.top_pad = curses.newpad(2000, 500)
-        self.tab_pad = curses.newpad(2000, 500)
-        self.bottom_bar = curses.newpad(1, 500)
-        self.help_screen_pad = curses.newpad(500, 500)
+        self.top_pad = curses.newpad(2000, self.pad_width)
+        self.tab_pad = curses.newpad(2000, self.pad_width)
+        self.bottom_bar = curses.newpad(1, self.pad_width)
+        self.tops = {}
+        self.tabs = {}
 
         self.top_maxy = 0
         self.tab_maxy = 0
@@ -108,7 +108,7 @@ class WeatherPrinter(object):
         self.top_maxy = self.top_pad.getyx()[0] + 1
 
     def wrap_text(self, text):
-        return fill(text, self.screen_width)
+        return wrap(text, self.screen_width)
 
     def print_hourly_top(self, n_day, day):
         title = 'Weather for {}, {}'.format(
@@ -152,90 +152,83 @@ class WeatherPrinter(object):
             self.addustr(self.top_pad, outlook[lent:] + '\n\n')
         self.top_maxy = self.top_pad.getyx()[0] + 1
 
-    def print_hourly_tab(self, n_day, period):
-        width_counter = 0
-        for c in self.cols:
-            for i, head in enumerate(c[0]):
-                head_text = '{:^{}}'.format(head, c[1])
-                self.tab_pad.move(i, width_counter)
-                self.addustr(self.tab_pad, head_text, curses.A_BOLD)
-            width_counter += c[1]
-        top_row = (
-            self.tab_pad.getyx()[0] + max([len(c[0]) for c in self.cols]) - 1)
-        for i, rep in enumerate(period['Rep']):
-            width_counter = 0
-            for c in self.cols:
-                cell_text = '{:^{}}'.format(c[2].format(**rep), c[1])
-                self.tab_pad.move(top_row + i, width_counter)
-                self.addustr(self.tab_pad, cell_text)
-                width_counter += c[1]
+    def print_table_header(self, header):
+        for i, line in enumerate(header):
+            self.tab_pad.move(i, 0)
+            self.addustr(self.tab_pad, line, curses.A_BOLD)
+        return len(header)
+
+    def print_hourly_tab(self, n_day, reps):
+        top_row = self.print_table_header(HOURLY_HEADER)
+        for i, rep in enumerate(reps):
+            self.tab_pad.move(top_row + i, 0)
+            self.addustr(self.tab_pad, hourly_row(rep))
         self.tab_maxy = self.tab_pad.getyx()[0]
-        self.tab_maxx = sum([c[1] for c in self.cols]) - 2
+        self.tab_maxx = table_width(HOURLY_COLUMNS) - 2
 
     def print_hourly_weather(self, n_day, top_only=False):
-        day = date.today() + timedelta(n_day)
-        period = self.fcs.hourly_fcs['Period'][n_day]
-        assert period['value'] == day.strftime('%Y-%m-%dZ')
+        day = (self.fcs.start_date or date.today()) + timedelta(n_day)
+        table = self.fcs.hourly_fcs
+        assert table.periods[n_day] == day.strftime('%Y-%m-%dZ')
 
         self.print_hourly_top(n_day, day)
         if not top_only:
-            self.print_hourly_tab(n_day, period)
+            self.print_hourly_tab(
+                n_day, [hourly_rep(row) for row in table.rows(n_day)])
 
     def print_weather_brief(self, top_only=False):
-        period = self.fcs.daily_fcs['Period']
-
-        width_counter = 0
-        for c in self.daily_cols:
-            for i, head in enumerate(c[0]):
-                head_text = '{:^{}}'.format(head, c[1])
-                self.tab_pad.move(i, width_counter)
-                self.addustr(self.tab_pad, head_text, curses.A_BOLD)
-            width_counter += c[1]
-        top_row = (
-            self.tab_pad.getyx()[0] +
-            max([len(c[0]) for c in self.daily_cols]))
-        c = self.daily_cols[0]
-        for i, rep in enumerate(period):
-            cell_text = '{:<{}}   '.format(rep['value'], c[1] - 3)
+        if top_only:
+            return
+        table = self.fcs.daily_fcs
+        top_row = self.print_table_header(DAILY_HEADER)
+        width = DAILY_COLUMNS[0][1] - 3
+        for i, value in enumerate(table.periods):
             self.tab_pad.move(top_row + i * 4, 0)
-            self.addustr(self.tab_pad, cell_text)
-
-            cell_text = '{:>{}}   '.format(
-                c[2].format(**rep['Rep'][0]), c[1] - 3)
-            self.tab_pad.move(top_row + i * 4 + 1, 0)
-            self.addustr(self.tab_pad, cell_text)
-
-            cell_text = '{:>{}}   '.format(
-                c[3].format(**rep['Rep'][1]), c[1] - 3)
-            self.tab_pad.move(top_row + i * 4 + 2, 0)
-            self.addustr(self.tab_pad, cell_text)
-
-        for i, rep in enumerate(period):
-            rep = rep['Rep']
-            width_counter = self.daily_cols[0][1]
-            for c in self.daily_cols[1:]:
-                cell_text = '{:^{}}'.format(c[2].format(**rep[0]), c[1])
-                self.tab_pad.move(top_row + i * 4 + 1, width_counter)
-                self.addustr(self.tab_pad, cell_text)
-
-                cell_text = '{:^{}}'.format(c[3].format(**rep[1]), c[1])
-                self.tab_pad.move(top_row + i * 4 + 2, width_counter)
-                self.addustr(self.tab_pad, cell_text)
-
-                width_counter += c[1]
+            self.addustr(
+                self.tab_pad, '{:<{}}   '.format(day_name(value), width))
+            for j, row in enumerate(table.rows(i)):
+                self.tab_pad.move(top_row + i * 4 + j + 1, 0)
+                self.addustr(self.tab_pad, daily_rows[j](daily_rep(row)))
 
         self.tab_maxy = self.tab_pad.getyx()[0]
-        self.tab_maxx = sum([c[1] for c in self.daily_cols]) - 2
+        self.tab_maxx = table_width(DAILY_COLUMNS) - 2
+
+    @staticmethod
+    def copy_pad(pad, rows, cols):
+        copy = curses.newpad(rows, cols)
+        pad.overwrite(copy, 0, 0, 0, 0, rows - 1, cols - 1)
+        return copy
+
+    def render(self, screen, screen_width):
+        key = (screen, screen_width)
+        if key not in self.tops:
+            self.tops = {
+                k: v for k, v in self.tops.items() if k[1] == screen_width}
+            top_only = screen in self.tabs
+            self.print_screen(screen, screen_width, top_only)
+            self.tops[key] = (
+                self.copy_pad(
+                    self.top_pad, self.top_maxy + 1,
+                    min(screen_width, self.pad_width)),
+                self.top_maxy)
+            if not top_only:
+                self.tabs[screen] = (
+                    self.copy_pad(
+                        self.tab_pad, self.tab_maxy + 1, self.pad_width),
+                    self.tab_maxy, self.tab_maxx)
+        return RenderedScreen(*self.tops[key], *self.tabs[screen])
 
     def print_screen(self, screen, screen_width=None, top_only=False):
         if screen_width is not None:
             self.screen_width = screen_width
-        self.top_pad.clear()
+        self.top_pad.erase()
+        self.top_pad.move(0, 0)
         self.top_maxy = 0
         if not top_only:
             self.tab_maxy = 0
             self.tab_maxx = 0
-            self.tab_pad.clear()
+            self.tab_pad.erase()
+            self.tab_pad.move(0, 0)
         if screen in range(0, 5):
             self.print_hourly_weather(screen, top_only)
         elif screen == 8:
@@ -247,6 +240,7 @@ class WeatherPrinter(object):
 
 
 class WeatherApp(object):
+    resize_delay = 100
     key_map = {
         '0': 0, '1': 1, '2': 2, '3': 3, '4': 4,
         '5': 8, '6': 8, '7': 8, '8': 8, '9': 9,
@@ -273,14 +267,16 @@ class WeatherApp(object):
 
         self.printer = WeatherPrinter(self.fcs, self.x + 1)
         self.print_screen(start_screen)
+        self.first_screen_time = time.perf_counter()
+        self.fcs.prefetch()
 
     def print_resize(self):
         self.y = self.stdscr.getmaxyx()[0] - 1
         self.x = self.stdscr.getmaxyx()[1] - 1
-        self.printer.print_screen(self.screen_showing, self.x + 1, True)
+        self.screen = self.printer.render(self.screen_showing, self.x + 1)
 
-        self.maxx = max(self.printer.tab_maxx, self.x - 1)
-        self.maxy = self.printer.tab_maxy + self.printer.top_maxy
+        self.maxx = max(self.screen.tab_maxx, self.x - 1)
+        self.maxy = self.screen.tab_maxy + self.screen.top_maxy
 
         if self.y > (self.maxy - self.scrolly):
             self.scrolly = max(self.maxy - (self.y - 1), 0)
@@ -292,59 +288,64 @@ class WeatherApp(object):
         self.screen_showing = screen
         self.scrolly = 0
         self.scrollx = 0
-        self.printer.print_screen(self.screen_showing)
+        self.screen = self.printer.render(self.screen_showing, self.x + 1)
 
-        self.maxy = self.printer.tab_maxy + self.printer.top_maxy
-        self.maxx = max(self.printer.tab_maxx, self.x - 1)
+        self.maxy = self.screen.tab_maxy + self.screen.top_maxy
+        self.maxx = max(self.screen.tab_maxx, self.x - 1)
 
         self.draw_screen()
 
+    def size_changed(self):
+        return (self.y + 1, self.x + 1) != self.stdscr.getmaxyx()
+
     def draw_screen(self):
-        self.stdscr.clear()
-        self.stdscr.refresh()
+        # A pending KEY_RESIZE will redraw at the new size
+        if self.size_changed():
+            return
 
-        top_y = self.printer.top_maxy
+        self.stdscr.erase()
+        self.stdscr.noutrefresh()
 
-        try:
-            assert self.y == self.stdscr.getmaxyx()[0] - 1
-            assert self.x == self.stdscr.getmaxyx()[1] - 1
-        except AssertionError:
-            self.print_resize()
-            return
+        top_y = self.screen.top_maxy
 
-        self.printer.top_pad.noutrefresh(
-            self.scrolly, 0, 0, 0, min(top_y, self.y), self.x)
+        if self.scrolly <= top_y:
+            self.screen.top_pad.noutrefresh(
+                self.scrolly, 0, 0, 0, min(top_y, self.y), self.x)
 
         if self.y - (top_y - self.scrolly) > 1:
-            self.printer.tab_pad.noutrefresh(
+            self.screen.tab_pad.noutrefresh(
                 max(0, self.scrolly - top_y), self.scrollx,
                 top_y - self.scrolly, 0,
                 self.y, self.x)
 
         self.printer.bottom_bar.noutrefresh(
             0, 0, self.y, 0, self.y, self.x)
+        curses.doupdate()
 
+    def wait_for_resize(self):
+        self.stdscr.timeout(self.resize_delay)
         try:
-            assert self.y == self.stdscr.getmaxyx()[0] - 1
-            assert self.x == self.stdscr.getmaxyx()[1] - 1
-        except AssertionError:
-            self.print_resize()
-            return
-
-        with open('/tmp/log', 'a') as f:
-            f.write('{}\t{}\t{}\t{}\t{}\t{}\n'.format(
-                self.maxy, self.y, self.scrolly,
-                self.maxx, self.x, self.scrollx))
-        curses.doupdate()
+            while True:
+                try:
+                    c = self.stdscr.getkey()
+                except curses.error:
+                    return None
+                if c != 'KEY_RESIZE':
+                    return c
+        finally:
+            self.stdscr.timeout(-1)
 
     def main_loop(self):
+        pending = None
         while True:
-            c = self.stdscr.getkey()
+            c = pending or self.stdscr.getkey()
+            pending = None
             if c == 'q':
                 return
             elif c in self.key_map and self.screen_showing != self.key_map[c]:
                 self.print_screen(self.key_map[c])
             elif c == 'KEY_RESIZE':
+                pending = self.wait_for_resize()
                 self.print_resize()
             elif c == 'KEY_DOWN':
                 if self.scrolly + self.y - 1 < self.maxy:
@@ -365,18 +366,80 @@ class WeatherApp(object):
 def run_curses_app(screen, fcs):
     wap = WeatherApp(screen, fcs)
     wap.main_loop()
+    return wap
 
 
 def run_app(args):
+    try:
+        run_mode(args)
+    finally:
+        if args['metrics']:
+            metrics.write(args['metrics'])
+
+
+def run_mode(args):
+    WeatherClient.max_workers = args['workers']
+    WeatherClient.timeout = args['timeout']
+    WeatherClient.retries = args['retries']
+    # A shared server applies the API key's rate limit for its clients
+    if not args['server']:
+        WeatherClient.rate_limit = args['rate_limit']
+
+    if args['serve']:
+        from pymetweather.server import CacheServer, parse_address
+        CacheServer(
+            parse_address(args['serve']), args['api_key'],
+            os.path.join(args['datadir'], 'archive')).run()
+        return
+    if args['server']:
+        WeatherClient.base_url = args['server'].rstrip('/') + '/'
+        WeatherClient.shared_tables = True
+
+    rules = None
+    if args['alerts']:
+        from pymetweather.alerts import Rules
+        rules = Rules.load(args['alerts'])
+
+    if args['sites_file']:
+        from pymetweather.batch import BatchForecast
+        batch = BatchForecast(
+            args['api_key'], BatchForecast.read_sites_file(args['sites_file']),
+            args['datadir'], args['workers'], args['processes'])
+        batch.refresh(args['dont_update'])
+        if rules is not None:
+            from pymetweather.alerts import write_alerts
+            write_alerts(rules.evaluate(batch.weathers.values()), sys.stdout)
+        return
+    start_time = time.perf_counter()
     fcs = WeatherForecast(args['api_key'], args['location'], args['datadir'])
+    if args['daemon']:
+        from pymetweather.daemon import RefreshDaemon
+        RefreshDaemon(
+            fcs, args['dont_update'], args['metrics'], rules).run()
+        return
     if args['quiet_update']:
-        fcs.load(True)
+        fcs.get_data(True)
+        return
+    if args['issued']:
+        fcs.load_archived(args['issued'])
+    else:
+        fcs.load(args['dont_update'])
+    if args['format']:
+        from pymetweather.output import write_forecasts
+        write_forecasts(fcs, args['format'], sys.stdout)
         return
-    fcs.load(args['dont_update'])
-    curses.wrapper(run_curses_app, fcs)
+
+    with hold_logging():
+        wap = curses.wrapper(run_curses_app, fcs)
+    logger.info('Time to first screen {:.3f}s'.format(
+        wap.first_screen_time - start_time))
 
 
 def main():
+    setup_logging()
+    locale.setlocale(locale.LC_ALL, '')
     args = get_config_args()
-    args.update(get_command_line_args())
+    args.update({
+        k: v for k, v in get_command_line_args().items()
+        if v is not None or k not in args})
     run_app(args)
@@ -0,0 +1,149 @@
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from pymetweather.forecasts import (
+    MAIN_PATH, TABLE_PATH, DailyForecast, RetreivalError, SchemaError,
+    ThreeHourForecast, WeatherClient, logger, parse_table)
+
+
+class CacheEntry(object):
+    def __init__(self, body, content_type, expires):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"{}"'.format(sha1(body).hexdigest())
+        self.expires = expires
+
+
+class ForecastCache(object):
+    ttls = [('capabilities', 5 * 60), ('sitelist', 24 * 60 * 60)]
+    default_ttl = 15 * 60
+    tables = {cls.res: cls for cls in (DailyForecast, ThreeHourForecast)}
+
+    def __init__(self, upstream, archive_dir=None):
+        self.upstream = upstream
+        self.archive_dir = archive_dir
+        self.entries = {}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def ttl(self, path):
+        for part, ttl in self.ttls:
+            if part in path:
+                return ttl
+        return self.default_ttl
+
+    def get(self, path, params):
+        key = (path, tuple(sorted(params.items())))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires > time.time():
+                return entry
+            event = self.in_flight.get(key)
+            leader = event is None
+            if leader:
+                event = self.in_flight[key] = threading.Event()
+
+        if not leader:
+            event.wait()
+            return self.entries.get(key)
+
+        try:
+            fresh = self.fetch(path, params)
+            with self.lock:
+                if fresh is not None:
+                    self.entries[key] = entry = fresh
+                elif entry is not None:
+                    logger.warning('Serving stale {}'.format(path))
+            return entry
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            event.set()
+
+    def fetch(self, path, params):
+        if path.startswith(TABLE_PATH):
+            return self.fetch_table(path[len(TABLE_PATH):], params)
+
+        logger.info('Fetching {} {}'.format(path, params))
+        try:
+            response = WeatherClient.request(
+                self.upstream + path, params).result()
+            response.raise_for_status()
+        except Exception:
+            logger.error('Could not retreive {}'.format(path))
+            return None
+        return CacheEntry(
+            response.content,
+            response.headers.get('Content-Type', 'application/json'),
+            time.time() + self.ttl(path))
+
+    def fetch_table(self, path, params):
+        cls = self.tables.get(params.get('res'))
+        if cls is None or not path.startswith(MAIN_PATH):
+            return None
+        entry = self.get(path, params)
+        if entry is None:
+            return None
+
+        # Processed once here rather than by every client
+        try:
+            body = parse_table(
+                cls, entry.body, self.archive_dir, path.rsplit('/', 1)[-1])
+        except (RetreivalError, SchemaError) as e:
+            logger.error('Could not process {}: {}'.format(path, e))
+            return None
+        return CacheEntry(body, 'application/octet-stream', entry.expires)
+
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v for k, v in parse_qsl(url.query) if k != 'key'}
+        path = url.path.lstrip('/').replace('//', '/')
+
+        entry = self.server.cache.get(path, params)
+        if entry is None:
+            self.send_error(502, 'Could not retreive forecast')
+            return
+
+        if self.headers.get('If-None-Match') == entry.etag:
+            self.send_response(304)
+            self.send_header('ETag', entry.etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', entry.content_type)
+        self.send_header('Content-Length', str(len(entry.body)))
+        self.send_header('ETag', entry.etag)
+        self.end_headers()
+        self.wfile.write(entry.body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class CacheServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, api_key, archive_dir=None):
+        super().__init__(address, CacheRequestHandler)
+        WeatherClient.api_key = api_key
+        self.cache = ForecastCache(WeatherClient.base_url, archive_dir)
+
+    def run(self):
+        logger.info('Serving forecasts on {}:{}'.format(*self.server_address))
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            logger.info('Stopping forecast server')
+        finally:
+            self.server_close()
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
@@ -0,0 +1,205 @@
+from bisect import bisect_left
+import heapq
+import json
+from math import asin, cos, floor, radians, sin, sqrt
+import re
+import time
+
+from pymetweather.storage import atomic_write
+
+EARTH_RADIUS = 6371.0
+
+
+def process_name(name):
+    return re.sub(r"[-.()& ]'", '', name.strip().lower())
+
+
+def get_site_info(site):
+    if 'unitaryAuthArea' not in site:
+        site['unitaryAuthArea'] = ''
+    site['latitude'] = float(site['latitude'])
+    site['longitude'] = float(site['longitude'])
+
+    site['description'] = (
+        '{name} - {unitaryAuthArea} '
+        '{latitude:+.2f}{longitude:+.2f}/'
+    ).format(**site)
+    return site
+
+
+def parse_coordinates(text):
+    match = re.match(
+        r'^\s*([-+]?\d+(?:\.\d*)?)\s*,\s*([-+]?\d+(?:\.\d*)?)\s*$', text)
+    if match:
+        latitude, longitude = float(match.group(1)), float(match.group(2))
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError(
+                'Coordinates {} are outside -90..90, -180..180'.format(
+                    text.strip()))
+        return latitude, longitude
+
+
+class SpatialIndex(object):
+    cell_size = 0.1
+    # Beyond this many rings it is quicker to check every site
+    max_ring = 20
+
+    def __init__(self, sites):
+        self.lats = [radians(float(s['latitude'])) for s in sites]
+        self.lons = [radians(float(s['longitude'])) for s in sites]
+        self.cos_lats = [cos(lat) for lat in self.lats]
+
+        self.cells = {}
+        for i, s in enumerate(sites):
+            self.cells.setdefault(
+                self.cell(float(s['latitude']), float(s['longitude'])),
+                []).append(i)
+
+    def cell(self, latitude, longitude):
+        return (
+            int(floor(latitude / self.cell_size)),
+            int(floor(longitude / self.cell_size)))
+
+    def ring(self, centre, r):
+        y, x = centre
+        if r == 0:
+            return self.cells.get(centre, [])
+        found = []
+        for dy in range(-r, r + 1):
+            step = 1 if abs(dy) == r else 2 * r
+            for dx in range(-r, r + 1, step):
+                found.extend(self.cells.get((y + dy, x + dx), []))
+        return found
+
+    def distances(self, latitude, longitude, candidates):
+        lat, lon = radians(latitude), radians(longitude)
+        cos_lat = cos(lat)
+        lats, lons, cos_lats = self.lats, self.lons, self.cos_lats
+        return [
+            2 * EARTH_RADIUS * asin(sqrt(min(1.0, (
+                sin((lats[i] - lat) / 2) ** 2 +
+                cos_lat * cos_lats[i] * sin((lons[i] - lon) / 2) ** 2))))
+            for i in candidates]
+
+    def searched_km(self, latitude, longitude, centre, r):
+        y, x = centre
+        size = self.cell_size
+        lat_degrees = min(
+            latitude - (y - r) * size, (y + r + 1) * size - latitude)
+        lon_degrees = min(
+            longitude - (x - r) * size, (x + r + 1) * size - longitude)
+        scale = 0.99 * cos(radians(min(90, abs(latitude) + (r + 1) * size)))
+        return radians(min(lat_degrees, lon_degrees * scale)) * EARTH_RADIUS
+
+    def nearest(self, latitude, longitude, k=1):
+        centre = self.cell(latitude, longitude)
+        best = []
+        for r in range(self.max_ring + 1):
+            candidates = self.ring(centre, r)
+            if candidates:
+                best = heapq.nsmallest(k, best + list(zip(
+                    self.distances(latitude, longitude, candidates),
+                    candidates)))
+            if len(best) >= k and best[-1][0] <= self.searched_km(
+                    latitude, longitude, centre, r):
+                return best
+            if len(best) == len(self.lats):
+                return best
+
+        candidates = range(len(self.lats))
+        return heapq.nsmallest(k, zip(
+            self.distances(latitude, longitude, candidates), candidates))
+
+
+class SiteIndex(object):
+    version = 1
+    max_age = 30 * 24 * 60 * 60
+
+    def __init__(self, sites, keys, order, built=None):
+        self.sites = sites
+        self.keys = keys
+        self.order = order
+        self.built = time.time() if built is None else built
+
+        self.names = {}
+        for key, i in zip(keys, order):
+            self.names.setdefault(key, []).append(i)
+        self.ids = {site['id']: i for i, site in enumerate(sites)}
+        self._spatial = None
+
+    @property
+    def spatial(self):
+        if self._spatial is None:
+            self._spatial = SpatialIndex(self.sites)
+        return self._spatial
+
+    @classmethod
+    def build(cls, sites, regions):
+        region_ids = {r['@name']: r['@id'] for r in regions}
+
+        sites = [dict(
+            site,
+            processed_name=process_name(site['name']),
+            region_id=region_ids.get(site['region'])) for site in sites]
+        ordered = sorted(
+            range(len(sites)), key=lambda i: sites[i]['processed_name'])
+        keys = [sites[i]['processed_name'] for i in ordered]
+        return cls(sites, keys, ordered)
+
+    @classmethod
+    def load(cls, index_file):
+        try:
+            with open(index_file) as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            return None
+
+        if data.get('version') != cls.version:
+            return None
+        if time.time() - data['built'] > cls.max_age:
+            return None
+        return cls(data['sites'], data['keys'], data['order'], data['built'])
+
+    def save(self, index_file):
+        with atomic_write(index_file) as f:
+            json.dump({
+                'version': self.version,
+                'built': self.built,
+                'sites': self.sites,
+                'keys': self.keys,
+                'order': self.order,
+            }, f, ensure_ascii=False)
+
+    def site(self, i):
+        return get_site_info(dict(self.sites[i]))
+
+    def get(self, site_id):
+        if site_id in self.ids:
+            return self.site(self.ids[site_id])
+
+    def exact_matches(self, name):
+        return [self.site(i) for i in self.names.get(name, [])]
+
+    def prefix_matches(self, name):
+        start = bisect_left(self.keys, name)
+        end = bisect_left(self.keys, name + '\U0010ffff', start)
+        found = sorted(
+            self.order[start:end],
+            key=lambda i: (len(self.sites[i]['processed_name']), i))
+        return [self.site(i) for i in found]
+
+    def match(self, site_name):
+        site_name = process_name(site_name)
+        return (
+            self.exact_matches(site_name) or self.prefix_matches(site_name))
+
+    def nearest_many(self, coordinates, k=1):
+        return [self.nearest(lat, lon, k) for lat, lon in coordinates]
+
+    def nearest(self, latitude, longitude, k=1):
+        sites = []
+        for distance, i in self.spatial.nearest(latitude, longitude, k):
+            site = self.site(i)
+            site['distance'] = distance
+            sites.append(site)
+        return sites
@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+import fcntl
+import os
+import os.path
+import shutil
+import tempfile
+
+
+@contextmanager
+def atomic_write(path, mode='w', **kwargs):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmpfile = tempfile.mkstemp(
+        dir=directory, prefix='.' + os.path.basename(path) + '.')
+    try:
+        if os.path.exists(path):
+            shutil.copymode(path, tmpfile)
+        else:
+            os.chmod(tmpfile, 0o644)
+        with open(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmpfile, path)
+    except BaseException:
+        try:
+            os.remove(tmpfile)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def locked(path):
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,73 @@
+from array import array
+
+MISSING = -32768
+
+COMPASS = (
+    'N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
+    'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW')
+DAY_NIGHT = ('Day', 'Night')
+
+
+def to_int(value):
+    if value is None or value == '' or value == 'NA':
+        return MISSING
+    return int(value)
+
+
+class ForecastTable(object):
+    def __init__(self, fields, periods, starts, columns, derived=()):
+        self.fields = fields
+        self.periods = periods
+        self.starts = starts
+        self.columns = columns
+        self.derived = list(derived)
+
+    @classmethod
+    def from_periods(cls, periods, fields):
+        columns = {
+            name: array('b' if vocab else 'h') for name, vocab in fields}
+        lookups = {
+            name: {v: i for i, v in enumerate(vocab)}
+            for name, vocab in fields if vocab}
+
+        values = []
+        starts = array('l', [0])
+        for period in periods:
+            values.append(period['value'])
+            for rep in period['Rep']:
+                for name, vocab in fields:
+                    value = rep.get(name)
+                    if vocab:
+                        columns[name].append(lookups[name].get(value, -1))
+                    else:
+                        columns[name].append(to_int(value))
+            starts.append(starts[-1] + len(period['Rep']))
+        return cls(fields, values, starts, columns)
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def add_column(self, name, values, typecode='h'):
+        self.columns[name] = array(typecode, values)
+        self.derived.append(name)
+
+    def column(self, name, period=None):
+        if period is None:
+            return self.columns[name]
+        return self.columns[name][self.starts[period]:self.starts[period + 1]]
+
+    def row(self, i):
+        rep = {}
+        for name, vocab in self.fields:
+            value = self.columns[name][i]
+            if vocab:
+                rep[name] = vocab[value] if value >= 0 else None
+            else:
+                rep[name] = None if value == MISSING else value
+        for name in self.derived:
+            rep[name] = self.columns[name][i]
+        return rep
+
+    def rows(self, period):
+        for i in range(self.starts[period], self.starts[period + 1]):
+            yield self.row(i)
@@ -0,0 +1,98 @@
+from array import array
+import json
+import mmap
+import struct
+import sys
+
+from pymetweather.storage import atomic_write
+from pymetweather.table import ForecastTable
+
+MAGIC = b'PMWT'
+VERSION = 1
+PREAMBLE = struct.Struct('<4sHI')
+ALIGN = 8
+
+
+class MappedTable(ForecastTable):
+    def __init__(self, fields, periods, starts, columns, derived, mapping):
+        super().__init__(fields, periods, starts, columns, derived)
+        self.mapping = mapping
+
+
+def typecode(column):
+    if isinstance(column, memoryview):
+        return column.format
+    return column.typecode
+
+
+def table_bytes(meta, table):
+    header = {
+        'meta': meta,
+        'byteorder': sys.byteorder,
+        'fields': [list(f) for f in table.fields],
+        'derived': table.derived,
+        'periods': table.periods,
+        'starts': list(table.starts),
+        'columns': {},
+    }
+
+    names = [name for name, vocab in table.fields] + table.derived
+    offset = 0
+    columns = {
+        name: array(typecode(table.columns[name]), table.columns[name])
+        for name in names}
+    for name in names:
+        column = columns[name]
+        header['columns'][name] = [column.typecode, offset, len(column)]
+        offset += -(-len(column) * column.itemsize // ALIGN) * ALIGN
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    header_bytes += b' ' * (-(PREAMBLE.size + len(header_bytes)) % ALIGN)
+
+    chunks = [PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)), header_bytes]
+    for name in names:
+        data = columns[name].tobytes()
+        chunks.append(data)
+        chunks.append(b'\0' * (-len(data) % ALIGN))
+    return b''.join(chunks)
+
+
+def write_table(path, meta, table):
+    with atomic_write(path, 'wb') as f:
+        f.write(table_bytes(meta, table))
+
+
+def read_table(path):
+    with open(path, 'rb') as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) != PREAMBLE.size:
+            raise ValueError('Truncated forecast file {}'.format(path))
+        magic, version, header_size = PREAMBLE.unpack(preamble)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Unknown forecast file format {}'.format(path))
+        header = json.loads(f.read(header_size).decode('utf-8'))
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    data_start = PREAMBLE.size + header_size
+    swap = header['byteorder'] != sys.byteorder
+    columns = {}
+    for name, (typecode, offset, count) in header['columns'].items():
+        start = data_start + offset
+        end = start + count * array(typecode).itemsize
+        if end > len(mapping):
+            mapping.close()
+            raise ValueError('Truncated forecast file {}'.format(path))
+        if swap:
+            column = array(typecode, mapping[start:end])
+            column.byteswap()
+        else:
+            column = memoryview(mapping)[start:end].cast(typecode)
+        columns[name] = column
+
+    fields = tuple(
+        (name, tuple(vocab) if vocab else None)
+        for name, vocab in header['fields'])
+    table = MappedTable(
+        fields, header['periods'], array('l', header['starts']), columns,
+        header['derived'], mapping)
+    return header['meta'], table
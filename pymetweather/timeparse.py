@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+MINUTE = timedelta(minutes=1)
+DAY_MINUTES = 24 * 60
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    return ZoneInfo(name)
+
+
+@lru_cache(maxsize=1024)
+def parse_time(value, tz):
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    time = datetime.fromisoformat(value)
+    if time.tzinfo is not None:
+        return time
+
+    # Repeated local times resolve to the later instant and skipped
+    # ones are moved forward, as pendulum does
+    zone = get_zone(tz)
+    earlier = time.replace(tzinfo=zone)
+    later = time.replace(tzinfo=zone, fold=1)
+    if later.utcoffset() > earlier.utcoffset():
+        return earlier.astimezone(timezone.utc).astimezone(zone)
+    return later
+
+
+@lru_cache(maxsize=1024)
+def parse_date(value):
+    return datetime(
+        int(value[0:4]), int(value[5:7]), int(value[8:10]),
+        tzinfo=timezone.utc)
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+@lru_cache(maxsize=256)
+def day_offsets(value, tz):
+    day = parse_date(value)
+    zone = get_zone(tz)
+
+    def offset(minutes):
+        local = (day + timedelta(minutes=minutes)).astimezone(zone)
+        return local.utcoffset() // MINUTE
+
+    before, after = offset(0), offset(DAY_MINUTES)
+    if before == after:
+        return before, DAY_MINUTES, after
+
+    low, high = 0, DAY_MINUTES
+    while high - low > 1:
+        middle = (low + high) // 2
+        if offset(middle) == before:
+            low = middle
+        else:
+            high = middle
+    return before, high, after
+
+
+def local_hours(value, minutes, tz):
+    before, change, after = day_offsets(value, tz)
+    if change == DAY_MINUTES:
+        return [(m + before) // 60 % 24 for m in minutes]
+    return [(m + (before if m < change else after)) // 60 % 24
+            for m in minutes]
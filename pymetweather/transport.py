@@ -0,0 +1,126 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pymetweather.forecasts import describe_error, logger
+from pymetweather.metrics import metrics
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class TokenBucket(object):
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        # Tokens may go negative, so waiting callers are served in order
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0, -self.tokens / self.rate)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            metrics.record('rate_limit_wait', delay)
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay:
+            metrics.record('rate_limit_wait', delay)
+            await asyncio.sleep(delay)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(api_key, per_minute):
+    if not per_minute:
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(api_key)
+        if bucket is None or bucket.burst != per_minute:
+            bucket = _buckets[api_key] = TokenBucket(
+                per_minute / 60, burst=per_minute)
+        return bucket
+
+
+class RetryPolicy(object):
+    def __init__(self, retries=3, backoff=1, max_backoff=60):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def retry_status(self, status, attempt):
+        return status in RETRY_STATUSES and attempt < self.retries
+
+    def delay(self, attempt, retry_after=None):
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+        if retry_after is not None and retry_after.isdigit():
+            delay = max(delay, min(self.max_backoff, int(retry_after)))
+        return delay
+
+    @staticmethod
+    def log_retry(url, reason, delay):
+        logger.warning('Retrying {} in {:.1f}s after {}'.format(
+            url.split('?')[0], delay, reason))
+        metrics.count('retries', reason=reason)
+
+
+class Transport(object):
+    def __init__(self, api_key=None, max_workers=10, timeout=30, retries=3,
+                 rate_limit=None):
+        self.timeout = timeout
+        self.retry = RetryPolicy(retries)
+        self.bucket = get_bucket(api_key, rate_limit)
+        self.executor = ThreadPoolExecutor(max_workers)
+
+        self.session = requests.Session()
+        self.session.params = {'key': api_key}
+        adapter = HTTPAdapter(
+            pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def submit(self, url, params=None, headers=None):
+        return self.executor.submit(self.fetch, url, params, headers)
+
+    def fetch(self, url, params=None, headers=None):
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                response = self.session.get(
+                    url, params=params, headers=headers,
+                    timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retry.retries:
+                    raise
+                reason = describe_error(e)
+                delay = self.retry.delay(attempt)
+            else:
+                if not self.retry.retry_status(
+                        response.status_code, attempt):
+                    return response
+                reason = 'HTTP {}'.format(response.status_code)
+                delay = self.retry.delay(
+                    attempt, response.headers.get('Retry-After'))
+            self.retry.log_retry(url, reason, delay)
+            time.sleep(delay)
+            attempt += 1
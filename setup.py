@@ -16,5 +16,7 @@ setup(
     packages=['pymetweather'],
     entry_points={'console_scripts': [
         'metweather = pymetweather.pymetweather:main']},
-    install_requires=['dpath', 'pendulum', 'requests_futures'],
+    python_requires='>=3.9',
+    install_requires=['requests'],
+    extras_require={'async': ['aiohttp']},
 )
@@ -0,0 +1,31 @@
+import os.path
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+
+from datapoint_stub import DataPoint, StubServer  # noqa: E402
+from pymetweather.forecasts import WeatherClient  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    for name, value in [
+            ('_transport', None), ('cache', None), ('api_key', None),
+            ('retries', 0), ('timeout', 5), ('rate_limit', None)]:
+        monkeypatch.setattr(WeatherClient, name, value)
+    yield WeatherClient
+    if WeatherClient._transport is not None:
+        WeatherClient._transport.executor.shutdown()
+
+
+@pytest.fixture
+def stub(client, monkeypatch):
+    server = StubServer(DataPoint(sites=20)).start()
+    monkeypatch.setattr(WeatherClient, 'base_url', server.base_url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
@@ -0,0 +1,53 @@
+import pytest
+
+from pymetweather.alerts import Rules
+
+README_RULES = '''
+[wet-or-windy]
+forecast = hourly
+when = Pp > 70 or G > 40
+window = 0 24
+
+[regional-extremes]
+forecast = daily
+aggregate = max Dm, min Nm
+by = region, date
+
+[foggy-nights]
+forecast = daily
+when = $ == Night and V <= MO
+'''
+
+
+def load(tmp_path, text):
+    path = tmp_path / 'rules.ini'
+    path.write_text(text)
+    return Rules.load(str(path))
+
+
+def test_load(tmp_path):
+    rules = load(tmp_path, README_RULES)
+    assert [rule.name for rule in rules.rules] == [
+        'wet-or-windy', 'regional-extremes', 'foggy-nights']
+
+
+@pytest.mark.parametrize('options, message', [
+    ('forecast = regional', 'Unknown forecast regional'),
+    ('when = Rain > 5', 'Unknown hourly forecast column Rain'),
+    ('forecast = daily\nwhen = T > 5', 'Unknown daily forecast column T'),
+    ('when = T > warm', 'T should be compared with a number, not warm'),
+    ('when = V == foggy', 'V should be one of UN VP PO MO GO VG EX'),
+    ('when = T >> 5', 'Could not parse condition T >> 5'),
+    ('aggregate = max Dm', 'Unknown hourly forecast column Dm'),
+    ('aggregate = mean T', 'Unknown aggregate mean'),
+    ('aggregate = max', 'Could not parse aggregate max'),
+    ('aggregate = max T\nby = site, week', 'Unknown group week'),
+    ('window = 0', 'Window should be a start and end hour'),
+    ('when = T > 5\nwhere = here', 'Unknown option where'),
+])
+def test_invalid_rules(tmp_path, options, message):
+    with pytest.raises(Exception) as error:
+        load(tmp_path, README_RULES + '\n[bad-rule]\n' + options + '\n')
+    assert str(error.value).startswith(
+        'Alert rule [bad-rule] in {}: '.format(tmp_path / 'rules.ini'))
+    assert message in str(error.value)
@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+import json
+import threading
+
+from datapoint_stub import SITE_PATH
+from pymetweather import batch, forecasts
+from pymetweather.batch import BatchForecast
+
+SITES = ['3002', '3003', '3004']
+
+
+def test_overlapping_runs_fetch_once(stub, tmp_path):
+    # Slow enough that the second run starts while the first is fetching
+    stub.delay = 0.1
+    BatchForecast('k', SITES, str(tmp_path)).load()
+    barrier = threading.Barrier(2)
+    failed = []
+
+    def refresh():
+        batch = BatchForecast('k', SITES, str(tmp_path))
+        barrier.wait()
+        failed.extend(batch.refresh())
+
+    threads = [threading.Thread(target=refresh) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failed == []
+    for site in SITES:
+        assert stub.requests[SITE_PATH + site] == 2
+
+
+def test_same_site_twice(stub, tmp_path):
+    batch = BatchForecast('k', ['Exeter', 'exeter'], str(tmp_path))
+    assert batch.refresh() == []
+    assert stub.requests[SITE_PATH + '3002'] == 2
+
+
+def test_holds_one_lock(stub, tmp_path, monkeypatch):
+    held = []
+    most = []
+
+    @contextmanager
+    def counted(path, locked=batch.locked):
+        with locked(path):
+            held.append(path)
+            most.append(len(held))
+            yield
+            held.remove(path)
+
+    monkeypatch.setattr(batch, 'locked', counted)
+    monkeypatch.setattr(forecasts, 'locked', counted)
+    sites = [str(3000 + i) for i in range(20)]
+    assert BatchForecast('k', sites, str(tmp_path)).refresh() == []
+    assert max(most) == 1
+
+
+def test_coordinates_keep_their_sign(stub, tmp_path):
+    batch = BatchForecast('k', ['51.55,-3.0', '51.55,3.0'], str(tmp_path))
+    west, east = [batch.site_dir(site) for site in batch.sites]
+    assert west != east
+    batch.load()
+    for weather in batch.weathers.values():
+        nearest = weather.get_nearest_sites(*weather.coordinates)[0]
+        assert weather.site_id == nearest['id']
+
+
+def test_cached_site_needs_matching_coordinates(stub, tmp_path):
+    def cached_site(coordinates):
+        with open(site_file) as f:
+            data = json.load(f)
+        data.update(site_id='cached', coordinates=coordinates)
+        with open(site_file, 'w') as f:
+            json.dump(data, f)
+        batch = BatchForecast('k', ['51.55,-3.0'], str(tmp_path))
+        batch.load()
+        return batch.weathers['51.55,-3.0'].site_id
+
+    batch = BatchForecast('k', ['51.55,-3.0'], str(tmp_path))
+    batch.load()
+    weather = batch.weathers['51.55,-3.0']
+    site_file = weather.site_file
+    assert cached_site([51.55, -3.0]) == 'cached'
+    assert cached_site([51.55, 3.0]) == weather.site_id
@@ -0,0 +1,22 @@
+import sys
+
+import pytest
+
+from pymetweather.get_args import get_command_line_args
+
+
+def parse(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['metweather'] + list(args))
+    return get_command_line_args()
+
+
+def test_issued(monkeypatch):
+    issued = parse(monkeypatch, '--issued', '2026-10-17T09:00')['issued']
+    assert issued.isoformat() == '2026-10-17T09:00:00+01:00'
+
+
+def test_bad_issued_is_a_usage_error(monkeypatch, capsys):
+    with pytest.raises(SystemExit) as exit:
+        parse(monkeypatch, '--issued', 'yesterday')
+    assert exit.value.code == 2
+    assert "invalid time 'yesterday'" in capsys.readouterr().err
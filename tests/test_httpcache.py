@@ -0,0 +1,73 @@
+from urllib.parse import parse_qs, urlsplit
+
+from datapoint_stub import SITE_PATH
+from pymetweather.forecasts import DailyForecast, WeatherForecast
+
+LAST_MODIFIED = 'Wed, 14 Oct 2026 06:00:00 GMT'
+
+
+def load_exeter(client, tmp_path):
+    weather = WeatherForecast('k', 'Exeter', str(tmp_path))
+    weather.get_data(True)
+    fc = weather.forecasts['daily']
+    return fc, client.cache.key(*fc.data_request())
+
+
+def refetch(fc):
+    fc.start_update()
+    fc.complete_update()
+    assert fc.status
+
+
+def site_requests(stub):
+    requests = []
+    for target, headers in stub.received:
+        url = urlsplit(target)
+        if (url.path == SITE_PATH + '3002' and
+                parse_qs(url.query)['res'] == ['daily']):
+            requests.append(headers)
+    return requests
+
+
+def test_stores_validators(stub, client, tmp_path):
+    stub.response_headers['Last-Modified'] = LAST_MODIFIED
+    fc, key = load_exeter(client, tmp_path)
+
+    meta = client.cache.get_meta(key)
+    assert meta['etag'].startswith('"')
+    assert meta['last_modified'] == LAST_MODIFIED
+    assert client.cache.body(key).startswith(b'{"SiteRep"')
+
+
+def test_sends_conditional_headers(stub, client, tmp_path):
+    stub.response_headers['Last-Modified'] = LAST_MODIFIED
+    fc, key = load_exeter(client, tmp_path)
+    refetch(fc)
+
+    first, second = site_requests(stub)
+    assert 'If-None-Match' not in first
+    assert second['If-None-Match'] == client.cache.get_meta(key)['etag']
+    assert second['If-Modified-Since'] == LAST_MODIFIED
+
+
+def test_not_modified_skips_processing(stub, client, tmp_path, monkeypatch):
+    fc, key = load_exeter(client, tmp_path)
+    table = fc.table
+    processed = []
+    monkeypatch.setattr(
+        DailyForecast, 'process_forecast',
+        lambda self: processed.append(self))
+    refetch(fc)
+
+    assert len(site_requests(stub)) == 2
+    assert processed == []
+    assert fc.table is table
+
+
+def test_fresh_response_is_not_requested(stub, client, tmp_path):
+    stub.response_headers['Cache-Control'] = 'max-age=600'
+    fc, key = load_exeter(client, tmp_path)
+    refetch(fc)
+
+    assert len(site_requests(stub)) == 1
+    assert fc.table is not None
@@ -0,0 +1,23 @@
+import io
+import logging
+import threading
+
+from pymetweather.forecasts import hold_logging, logger
+
+
+def test_records_are_held_until_released(monkeypatch):
+    stream = io.StringIO()
+    monkeypatch.setattr(logger, 'handlers', [logging.StreamHandler(stream)])
+
+    with hold_logging():
+        logger.info('fetching')
+        thread = threading.Thread(
+            target=logger.error, args=('Could not update',))
+        thread.start()
+        thread.join()
+        logger.warning('Retreival error')
+        assert stream.getvalue() == ''
+
+    assert stream.getvalue() == 'Could not update\nRetreival error\n'
+    logger.error('done')
+    assert stream.getvalue().endswith('done\n')
@@ -0,0 +1,27 @@
+import json
+
+from pymetweather.metrics import Metrics
+
+
+def test_mixed_label_values_export(tmp_path):
+    metrics = Metrics()
+    metrics.count('responses', status=200)
+    metrics.count('responses', status='error')
+    metrics.count('responses', status=200)
+    metrics.record('download', 0.5, forecast='DailyForecast', status=304)
+    metrics.record('download', 0.25, forecast='DailyForecast', status='error')
+
+    assert metrics.to_dict()['counters'] == [
+        {'name': 'responses', 'labels': {'status': '200'}, 'value': 2},
+        {'name': 'responses', 'labels': {'status': 'error'}, 'value': 1}]
+    text = metrics.to_prometheus()
+    assert 'pymetweather_responses_total{status="200"} 2\n' in text
+    assert 'pymetweather_responses_total{status="error"} 1\n' in text
+    assert ('pymetweather_download_seconds_count'
+            '{forecast="DailyForecast",status="304"} 1\n') in text
+
+    metrics.write(str(tmp_path / 'metrics.json'))
+    metrics.write(str(tmp_path / 'metrics.prom'))
+    with open(tmp_path / 'metrics.json') as f:
+        assert len(json.load(f)['spans']) == 2
+    assert (tmp_path / 'metrics.prom').read_text() == text
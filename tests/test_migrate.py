@@ -0,0 +1,33 @@
+import json
+import os.path
+import shutil
+
+from pymetweather.forecasts import WeatherForecast
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def test_baseline_files_are_replaced(stub, tmp_path):
+    # Written by the original release, with display strings in place of
+    # DataPoint values
+    for name in ['met3hour.json', 'metdaily.json']:
+        shutil.copy(os.path.join(DATA, name), tmp_path / name)
+    with open(tmp_path / 'met-loc-site-id.json', 'w') as f:
+        json.dump({'name': 'Exeter', 'site_id': '3002',
+                   'region_id': '502', 'region_name': 'se'}, f)
+
+    weather = WeatherForecast('k', 'Exeter', str(tmp_path))
+    weather.get_data(True)
+
+    for kind, name in [('hourly', 'met3hour'), ('daily', 'metdaily')]:
+        assert weather.forecasts[kind].status
+        assert not (tmp_path / (name + '.json')).exists()
+        assert (tmp_path / (name + '.bin')).exists()
+    assert len(weather.hourly_fcs) == 40
+    assert weather.daily_fcs.column('W')[0] == 7
+    assert stub.requests['/public/data/val/wxfcs/all/json/3002'] == 2
+
+    reloaded = WeatherForecast('k', 'Exeter', str(tmp_path))
+    reloaded.get_data(True)
+    assert stub.requests['/public/data/val/wxfcs/all/json/3002'] == 2
+    assert reloaded.daily_fcs.column('W')[0] == 7
@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+
+import pytest
+
+from pymetweather.codes import VISIBILITY_TYPES, WEATHER_NAMES
+from pymetweather.forecasts import WeatherForecast
+from pymetweather.output import write_forecasts
+
+
+@pytest.fixture
+def weather(stub, tmp_path):
+    weather = WeatherForecast('k', 'Exeter', str(tmp_path))
+    weather.load()
+    return weather
+
+
+def output(weather, format):
+    stream = io.StringIO()
+    write_forecasts(weather, format, stream)
+    return stream.getvalue()
+
+
+def test_csv_is_one_table(weather):
+    rows = list(csv.DictReader(io.StringIO(output(weather, 'csv'))))
+    kinds = [row['forecast'] for row in rows]
+    assert kinds == sorted(kinds, key=['hourly', 'daily', 'regional'].index)
+    assert set(kinds) == {'hourly', 'daily', 'regional'}
+    for row in rows:
+        assert None not in row and None not in row.values()
+        if row['forecast'] == 'regional':
+            assert row['text'] and row['W'] == ''
+        else:
+            assert row['text'] == ''
+            assert row['W'] in WEATHER_NAMES
+            assert row['V'] in VISIBILITY_TYPES.values()
+    hourly = next(row for row in rows if row['forecast'] == 'hourly')
+    assert hourly['Pp'] and hourly['PPd'] == ''
+
+
+def test_jsonl_decodes_codes(weather):
+    records = [
+        json.loads(line) for line in output(weather, 'jsonl').splitlines()]
+    for record in records:
+        if record['forecast'] != 'regional':
+            assert record['W'] in WEATHER_NAMES
+            assert record['V'] in VISIBILITY_TYPES.values()
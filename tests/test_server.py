@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+import requests
+
+from datapoint_stub import SITE_PATH
+from pymetweather.forecasts import WeatherClient, WeatherForecast
+from pymetweather.server import CacheServer, ForecastCache
+
+DAILY = ('val/wxfcs/all/json/3002', {'res': 'daily'})
+
+
+@pytest.fixture
+def cache(stub):
+    return ForecastCache(stub.base_url)
+
+
+@pytest.fixture
+def server(stub, tmp_path):
+    server = CacheServer(
+        ('127.0.0.1', 0), 'k', str(tmp_path / 'server' / 'archive'))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def server_url(server, path=''):
+    return 'http://127.0.0.1:{}/{}'.format(server.server_address[1], path)
+
+
+def test_concurrent_requests_make_one_upstream_call(stub, cache):
+    stub.delay = 0.2
+    barrier = threading.Barrier(8)
+    entries = []
+
+    def get():
+        barrier.wait()
+        entries.append(cache.get(*DAILY))
+
+    threads = [threading.Thread(target=get) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(entries) == 8
+    assert all(entry is entries[0] for entry in entries)
+    assert stub.requests[SITE_PATH + '3002'] == 1
+
+
+def test_fresh_entries_are_not_refetched(stub, cache):
+    first = cache.get(*DAILY)
+    assert cache.get(*DAILY) is first
+    assert stub.requests[SITE_PATH + '3002'] == 1
+
+    first.expires = 0
+    assert cache.get(*DAILY) is not first
+    assert stub.requests[SITE_PATH + '3002'] == 2
+
+
+def test_upstream_failure_serves_stale_entry(stub, server):
+    url = server_url(server, DAILY[0])
+    first = requests.get(url, params=DAILY[1])
+    assert first.status_code == 200
+
+    for entry in server.cache.entries.values():
+        entry.expires = 0
+    stub.status = 503
+    stale = requests.get(url, params=DAILY[1])
+    assert stale.status_code == 200
+    assert stale.content == first.content
+    assert stub.requests[SITE_PATH + '3002'] == 2
+
+    missing = requests.get(server_url(server, 'val/wxfcs/all/json/3003'))
+    assert missing.status_code == 502
+
+
+def test_clients_share_processed_tables(stub, server, tmp_path, monkeypatch):
+    direct = WeatherForecast('k', 'Exeter', str(tmp_path / 'direct'))
+    direct.get_data(True)
+
+    monkeypatch.setattr(WeatherClient, 'base_url', server_url(server))
+    monkeypatch.setattr(WeatherClient, 'shared_tables', True)
+    clients = []
+    for name in ['one', 'two']:
+        monkeypatch.setattr(WeatherClient, 'cache', None)
+        weather = WeatherForecast('k', 'Exeter', str(tmp_path / name))
+        weather.get_data(True)
+        clients.append(weather)
+
+    assert stub.requests[SITE_PATH + '3002'] == 4
+    assert ('tables/' + DAILY[0], (('res', 'daily'),)) in server.cache.entries
+    for weather in clients:
+        assert weather.site_id == '3002'
+        for kind in ['hourly', 'daily']:
+            table = weather.forecasts[kind].table
+            expected = direct.forecasts[kind].table
+            assert table.periods == expected.periods
+            assert [table.row(i) for i in range(len(table))] == [
+                expected.row(i) for i in range(len(expected))]
+    assert (tmp_path / 'server' / 'archive').is_dir()
@@ -0,0 +1,45 @@
+import random
+import time
+
+import pytest
+
+from datapoint_stub import DataPoint
+from pymetweather.sites import SpatialIndex, parse_coordinates
+
+
+@pytest.fixture(scope='module')
+def index():
+    return SpatialIndex(DataPoint(sites=2000).sites)
+
+
+def brute_force(index, latitude, longitude, k):
+    candidates = range(len(index.lats))
+    return sorted(zip(
+        index.distances(latitude, longitude, candidates), candidates))[:k]
+
+
+@pytest.mark.parametrize('latitude, longitude', [
+    (51.5, -0.12), (-0.12, 51.5), (40.7, -74.0), (0, 0), (89.9, 10),
+    (-90, 180), (54.0, -2.0)])
+def test_nearest_matches_brute_force(index, latitude, longitude):
+    start = time.perf_counter()
+    found = index.nearest(latitude, longitude, 3)
+    assert time.perf_counter() - start < 0.5
+    assert found == brute_force(index, latitude, longitude, 3)
+
+
+def test_nearest_random_queries(index):
+    rnd = random.Random(5)
+    for i in range(200):
+        latitude, longitude = rnd.uniform(49, 59), rnd.uniform(-8, 3)
+        assert index.nearest(latitude, longitude, 2) == brute_force(
+            index, latitude, longitude, 2)
+
+
+def test_parse_coordinates():
+    assert parse_coordinates('51.5, -0.12') == (51.5, -0.12)
+    assert parse_coordinates('Northolt') is None
+    with pytest.raises(ValueError):
+        parse_coordinates('91,0')
+    with pytest.raises(ValueError):
+        parse_coordinates('0,-180.5')
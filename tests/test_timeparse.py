@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pymetweather.timeparse import local_hours, parse_date, parse_time
+
+TIMEZONE = 'Europe/London'
+HOUR = timedelta(hours=1)
+
+
+# Expected values are those pendulum gave for the same input
+@pytest.mark.parametrize('text, local, offset', [
+    ('2026-01-15T09:00:00Z', '2026-01-15T09:00:00', 0),
+    ('2026-10-25T01:30:00Z', '2026-10-25T01:30:00', 0),
+    ('2026-07-01T12:00:00', '2026-07-01T12:00:00', 1),
+    ('2026-03-29T00:30:00', '2026-03-29T00:30:00', 0),
+    # Skipped when the clocks go forward, so moved an hour on
+    ('2026-03-29T01:00:00', '2026-03-29T02:00:00', 1),
+    ('2026-03-29T01:30:00', '2026-03-29T02:30:00', 1),
+    ('2026-03-29T02:00:00', '2026-03-29T02:00:00', 1),
+    ('2026-10-25T00:30:00', '2026-10-25T00:30:00', 1),
+    # Repeated when the clocks go back, so the later one
+    ('2026-10-25T01:00:00', '2026-10-25T01:00:00', 0),
+    ('2026-10-25T01:30:00', '2026-10-25T01:30:00', 0),
+    ('2026-10-25T02:00:00', '2026-10-25T02:00:00', 0),
+])
+def test_parse_time(text, local, offset):
+    result = parse_time(text, TIMEZONE)
+    assert result.replace(tzinfo=None).isoformat() == local
+    assert result.utcoffset() == offset * HOUR
+    assert result.timestamp() == datetime.fromisoformat(local).replace(
+        tzinfo=timezone(offset * HOUR)).timestamp()
+
+
+def test_parse_date():
+    assert parse_date('2026-03-29Z') == datetime(
+        2026, 3, 29, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('day, minutes, hours', [
+    ('2026-01-15Z', range(0, 1440, 180), [0, 3, 6, 9, 12, 15, 18, 21]),
+    ('2026-07-01Z', range(0, 1440, 180), [1, 4, 7, 10, 13, 16, 19, 22]),
+    ('2026-03-29Z', range(0, 1440, 180), [0, 4, 7, 10, 13, 16, 19, 22]),
+    ('2026-10-25Z', range(0, 1440, 180), [1, 3, 6, 9, 12, 15, 18, 21]),
+    ('2026-03-29Z', [0, 30, 60, 90, 120], [0, 0, 2, 2, 3]),
+    ('2026-10-25Z', [0, 30, 60, 90, 120], [1, 1, 1, 1, 2]),
+])
+def test_local_hours(day, minutes, hours):
+    assert local_hours(day, list(minutes), TIMEZONE) == hours
@@ -0,0 +1,12 @@
+from pymetweather.transport import get_bucket
+
+
+def test_bucket_allows_the_quota_in_a_burst():
+    bucket = get_bucket('burst-test', 100)
+    assert get_bucket('burst-test', 100) is bucket
+    assert [bucket.reserve() for i in range(100)] == [0] * 100
+    assert 0.5 < bucket.reserve() <= 0.6 + 1e-6
+
+
+def test_no_limit():
+    assert get_bucket('burst-test', 0) is None